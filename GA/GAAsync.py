@@ -0,0 +1,139 @@
+#----------------------------------------------------------
+# Asynchronous steady-state Genetic Algorithm
+#----------------------------------------------------------
+import time
+from concurrent.futures import wait, FIRST_COMPLETED
+import numpy as np
+from .GAProcess import GA
+from .GAPopulation.ArrayPopulation import ArrayPopulation
+from .GAEvaluation.Evaluator import ProcessPoolEvaluator
+
+
+class AsyncGA(GA):
+	'''
+	asynchronous steady-state GA without generation barrier:
+	each worker of the evaluator keeps evaluating a child. once a result arrives,
+	the child is inserted into the population, and a new child is bred and submitted immediately.
+	'''
+	def __init__(self, population, selection, crossover, mutation, fun_fitness=None, replacement='worst', tournament=3, rng=None):
+		'''
+		- population : ArrayPopulation, whose evaluator runs the workers, e.g. ProcessPoolEvaluator
+		- fun_fitness: fitness based on objective values, applied to the evaluation of each inserted child alone,
+			so it should be element-wise like the default one
+		- replacement: how the evaluated child is inserted into population
+			- 'worst'     : replace the worst individual if the child is not worse
+			- 'tournament': replace the worst of `tournament` random individuals if the child is not worse
+		- rng        : np.random.Generator, seed or SeedSequence, see `GA.rng`
+		'''
+		if not isinstance(population, ArrayPopulation):
+			raise ValueError('AsyncGA works with ArrayPopulation')
+		if not replacement in ('worst', 'tournament'):
+			raise ValueError('replacement should be "worst" or "tournament"')
+
+		super().__init__(population, selection, crossover, mutation, fun_fitness, rng=rng)
+		self.replacement = replacement
+		self.tournament = min(tournament, population.size)
+		self._fitness_sum = None # sum of fitness before normalized, updated by each insertion
+
+		# statistics of the last run
+		self.evaluations = 0 # count of evaluated children, excluding unchanged copies of parents
+		self.elapsed = 0.0   # seconds of the asynchronous evolution
+		self.busy = 0.0      # seconds of workers from submitting a child to receiving the result
+
+	@property
+	def throughput(self):
+		'''evaluations per second'''
+		return self.evaluations/self.elapsed if self.elapsed else 0.0
+
+	@property
+	def utilization(self):
+		'''
+		fraction of time the workers are busy, None if the evaluator runs in current process,
+		where the only "worker" is never idle but also breeds children
+		'''
+		if not isinstance(self.population.evaluator, ProcessPoolEvaluator):
+			return None
+		workers = self.population.evaluator.workers
+		return self.busy/(workers*self.elapsed) if self.elapsed else 0.0
+
+	def run(self, fun_evaluation, evaluations=1000):
+		'''
+		evolve the population until `evaluations` children are bred, then return the best individual.
+		a child identical to its parent reuses the parent's evaluation and is inserted without submitting.
+		'''
+		population, evaluator = self.population, self.population.evaluator
+		self.evaluations, self.elapsed, self.busy = 0, 0.0, 0.0
+		try:
+			# initialize population
+			population.initialize()
+			population.evaluate(fun_evaluation, self.fun_fitness)
+			self._fitness_sum = self.fun_fitness(population.evaluation).sum()
+
+			futures, bred = {}, 0
+			def submit_next():
+				'''breed children until one is submitted or the budget is used up'''
+				nonlocal bred
+				while bred<evaluations:
+					child, evaluation = self.breed(bred/evaluations)
+					bred += 1
+					if evaluation is None:
+						futures[evaluator.submit(fun_evaluation, child[None,:])] = time.perf_counter()
+						return
+					self.insert(child, evaluation)
+
+			# keep each worker evaluating a child
+			start = time.perf_counter()
+			for i in range(evaluator.workers):
+				submit_next()
+
+			while futures:
+				done, _ = wait(futures, return_when=FIRST_COMPLETED)
+				for future in done:
+					self.busy += time.perf_counter() - futures.pop(future)
+					solutions, evaluation = future.result()
+					self.insert(solutions[0], evaluation[0])
+					self.evaluations += 1
+					submit_next()
+
+			self.elapsed = time.perf_counter() - start
+			return population.best
+		finally:
+			# release resources of evaluator, e.g. process pool
+			evaluator.close()
+
+	def breed(self, progress):
+		'''
+		create a child from two parents with the selection, crossover and mutation operators
+			- progress: fraction of the evaluations budget used, which adjusts the mutation rate like GA.run()
+			- return  : (child, evaluation), evaluation of the parent if the child is an unchanged copy, otherwise None
+		'''
+		population = self.population
+		pos = self.selection.select_index(population, 2)
+		children, _, crossed = self.crossover.cross_rows(population, pos[:1], pos[1:])
+
+		rate = 1.0 - self.rng.random()**((1.0-progress)**3)
+		children, mutated = self.mutation.mutate_solutions(children, population.ranges, rate)
+		if not (crossed[0] or mutated[0]):
+			return children[0], population.evaluation[pos[0]]
+		return population.individual.normalize_solutions(children)[0], None
+
+	def insert(self, solution, evaluation):
+		'''insert an evaluated child into population with the replacement policy'''
+		population = self.population
+		if self.replacement=='worst':
+			pos = np.argmax(population.evaluation)
+		else:
+			candidates = self.rng.choice(population.size, self.tournament, replace=False)
+			pos = candidates[np.argmax(population.evaluation[candidates])]
+
+		if evaluation>population.evaluation[pos]:
+			return
+		population.solutions[pos] = population.individual.normalize_solutions(solution[None,:])[0]
+		population.evaluation[pos] = evaluation
+
+		# update fitness of the replaced individual only, then normalize
+		fitness = self.fun_fitness(np.array([evaluation]))[0]
+		fitness_sum = self._fitness_sum - population.fitness[pos]*self._fitness_sum + fitness
+		population.fitness[pos] = fitness/self._fitness_sum
+		population.fitness = population.fitness*(self._fitness_sum/fitness_sum)
+		self._fitness_sum = fitness_sum
@@ -0,0 +1,73 @@
+#----------------------------------------------------------
+# Checkpoint of GA process in a single .npz file
+#----------------------------------------------------------
+import os
+import json
+import time
+import numpy as np
+
+
+class Checkpoint:
+	'''
+	save state of a GA process every `generations` generations or `seconds` seconds, e.g.
+		g.run(f, 500, checkpoint=Checkpoint('run.npz', generations=20))
+	and continue the process from the file after crash:
+		g.resume(f, Checkpoint('run.npz', generations=20))
+	state is stored as plain arrays, and written to a temporary file then renamed,
+	so the file is always a complete checkpoint.
+	'''
+	def __init__(self, filename, generations=None, seconds=None, sync=True):
+		'''
+		- filename   : path of the .npz file
+		- generations: save every `generations` generations
+		- seconds    : save when `seconds` seconds passed since last saving
+		- sync       : flush the file to disk before renaming
+		'''
+		self.filename = filename
+		self.generations = generations
+		self.seconds = seconds
+		self.sync = sync
+		self._last = time.perf_counter()
+
+	def due(self, n):
+		'''whether to save at the end of generation n'''
+		if self.generations and n%self.generations==0:
+			return True
+		return bool(self.seconds) and time.perf_counter()-self._last>=self.seconds
+
+	def save(self, state):
+		'''write state, a dict of arrays, atomically'''
+		tmp = '{0}.{1}.tmp'.format(self.filename, os.getpid())
+		with open(tmp, 'wb') as f:
+			np.savez(f, **state)
+			if self.sync:
+				f.flush()
+				os.fsync(f.fileno())
+		os.replace(tmp, self.filename)
+		self._last = time.perf_counter()
+
+	def load(self):
+		'''read state as a dict of arrays'''
+		with np.load(self.filename) as data:
+			return {key: data[key] for key in data.files}
+
+	def exists(self):
+		return os.path.exists(self.filename)
+
+
+def get_random_state(rng):
+	'''
+	state of np.random.Generator `rng` and numpy global random state as arrays.
+	the generator state is stored as JSON text, since it may have integers over 64 bits
+	'''
+	name, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+	return {'random.keys': keys, 'random.pos': np.array(pos),
+			'random.has_gauss': np.array(has_gauss), 'random.cached_gaussian': np.array(cached_gaussian),
+			'random.generator': np.array(json.dumps(rng.bit_generator.state))}
+
+
+def set_random_state(state, rng):
+	'''restore `rng` and numpy global random state from `get_random_state()`'''
+	np.random.set_state(('MT19937', state['random.keys'], int(state['random.pos']),
+			int(state['random.has_gauss']), float(state['random.cached_gaussian'])))
+	rng.bit_generator.state = json.loads(str(state['random.generator']))
@@ -0,0 +1,88 @@
+#----------------------------------------------------------
+# Memoization of objective values
+#----------------------------------------------------------
+import hashlib
+from collections import OrderedDict
+import numpy as np
+
+
+class EvaluationCache:
+	'''
+	objective values keyed on hash of solution bytes, with LRU eviction.
+	solutions should be canonical, e.g. loops represented from element 0 by UniqueLoopIndividual,
+	so that duplicated genomes are evaluated only once.
+	'''
+	# approximate memory of an entry: 16 bytes digest, float value and dict overhead
+	ENTRY_BYTES = 200
+
+	def __init__(self, max_size=100000, max_memory=None):
+		'''
+		- max_size  : max count of cached values
+		- max_memory: optional memory bound in bytes, which limits the count further
+		'''
+		if max_memory:
+			max_size = min(max_size, max_memory//self.ENTRY_BYTES)
+		if max_size<1:
+			raise ValueError('the cache size should be larger than 0')
+
+		self.max_size = max_size
+		self.hits = 0
+		self.misses = 0
+		self._values = OrderedDict()
+		self._fun_evaluation = None
+
+	def __len__(self):
+		return len(self._values)
+
+	@property
+	def hit_rate(self):
+		total = self.hits + self.misses
+		return self.hits/total if total else 0.0
+
+	@staticmethod
+	def key(solution):
+		'''hash of solution bytes'''
+		return hashlib.blake2b(np.ascontiguousarray(solution).tobytes(), digest_size=16).digest()
+
+	def clear(self):
+		self._values.clear()
+		self.hits = 0
+		self.misses = 0
+
+	def bind(self, fun_evaluation):
+		'''cached values are for one objective function, so clear them when it changes'''
+		if self._fun_evaluation != fun_evaluation:
+			self.clear()
+			self._fun_evaluation = fun_evaluation
+
+	def lookup(self, solutions):
+		'''
+		get cached values of solutions:
+			- return: (keys, evaluation, found), evaluation is nan if not found
+		'''
+		keys = [self.key(solution) for solution in solutions]
+		evaluation = np.full(len(keys), np.nan)
+		found = np.zeros(len(keys), dtype=bool)
+		for i, key in enumerate(keys):
+			value = self._values.get(key)
+			if value is None: continue
+			self._values.move_to_end(key) # recently used
+			evaluation[i], found[i] = value, True
+
+		num = int(found.sum())
+		self.hits += num
+		self.misses += len(keys) - num
+		return keys, evaluation, found
+
+	def count_duplicates(self, num):
+		'''`num` solutions missed in `lookup()` duplicate others in the same batch, so they are hits'''
+		self.hits += num
+		self.misses -= num
+
+	def update(self, keys, evaluation):
+		'''store values and evict the least recently used ones'''
+		for key, value in zip(keys, evaluation):
+			self._values[key] = float(value)
+			self._values.move_to_end(key)
+		while len(self._values) > self.max_size:
+			self._values.popitem(last=False)
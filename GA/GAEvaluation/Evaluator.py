@@ -0,0 +1,414 @@
+#----------------------------------------------------------
+# Evaluation of objective function
+#----------------------------------------------------------
+import os
+import queue
+import signal
+import time
+import multiprocessing as mp
+import numpy as np
+from concurrent.futures import Future, ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+
+def batch_evaluation(fun_evaluation):
+	'''
+	mark objective function as batch-capable: 
+	it accepts a (dimension, n) matrix whose columns are solutions, 
+	and returns a vector with n objective values, e.g.
+		f = batch_evaluation(lambda x: x[0]**2+x[1]**2)
+	'''
+	fun_evaluation.batch = True
+	return fun_evaluation
+
+
+def is_batch(fun_evaluation):
+	'''whether the objective function is batch-capable'''
+	return getattr(fun_evaluation, 'batch', False)
+
+
+def evaluate_solutions(fun_evaluation, solutions):
+	'''
+	objective values of solutions:
+		- fun_evaluation: objective function
+		- solutions     : (n, dimension) matrix, one solution per row
+	'''
+	if not len(solutions):
+		return np.array([])
+
+	# evaluate all solutions in one call
+	if is_batch(fun_evaluation):
+		return np.asarray(fun_evaluation(solutions.T), dtype=float)
+
+	return np.array([fun_evaluation(solution) for solution in solutions], dtype=float)
+
+
+def _evaluate(fun_evaluation, local_search, solutions, improve):
+	'''
+	improve solutions with local search if necessary, then evaluate them
+		- local_search: function (solution, fun_evaluation) -> improved solution
+		- improve     : 0-1 vector, True to apply local search
+		- return      : (solutions, evaluation, seconds spent on local search)
+	'''
+	seconds = 0.0
+	if local_search and improve.any():
+		start = time.perf_counter()
+		solutions = solutions.copy()
+		for i in np.where(improve)[0]:
+			solutions[i] = local_search(solutions[i], fun_evaluation)
+		seconds = time.perf_counter() - start
+	return solutions, evaluate_solutions(fun_evaluation, solutions), seconds
+
+
+class Evaluator:
+	'''evaluate solutions in current process'''
+	def __init__(self, local_search=None, rate=1.0, cache=None, delta=None):
+		'''
+		- local_search: optional function (solution, fun_evaluation) -> improved solution,
+		                applied before evaluation, e.g. 2-opt for TSP
+		- rate        : probability to apply local search on an individual
+		- cache       : optional EvaluationCache, so that duplicated solutions are evaluated once
+		- delta       : optional function (solutions, move, params) -> change of objective values,
+		                so that mutated individuals are evaluated incrementally, see `Mutation.move`
+		'''
+		self.local_search = local_search
+		self.rate = rate
+		self.cache = cache
+		self.delta = delta
+		self.rng = np.random.default_rng() # np.random.Generator, injected by GA process
+
+		# statistics
+		self.calls = 0                # count of solutions evaluated by objective function
+		self.local_search_time = 0.0  # seconds spent on local search, summed over workers
+
+	def _improve_mask(self, num):
+		'''individuals to apply local search'''
+		if not self.local_search:
+			return np.zeros(num, dtype=bool)
+		return self.rng.random(num) < self.rate
+
+	def evaluate(self, fun_evaluation, solutions):
+		'''
+		evaluate solutions:
+			- fun_evaluation: objective function
+			- solutions     : (n, dimension) matrix, one solution per row
+			- return        : (solutions, evaluation), solutions may be improved by local search
+		'''
+		if self.cache is None:
+			self.calls += len(solutions)
+			return self._evaluate(fun_evaluation, solutions, self._improve_mask(len(solutions)))
+
+		# evaluate the solutions not found in cache only
+		self.cache.bind(fun_evaluation)
+		keys, evaluation, found = self.cache.lookup(solutions)
+		missed = np.where(~found)[0]
+		if len(missed):
+			# duplicated solutions in the batch are evaluated once
+			_, first, inverse = np.unique(np.array([keys[i] for i in missed]), return_index=True, return_inverse=True)
+			inverse = inverse.reshape(-1)
+			unique = missed[first]
+			self.cache.count_duplicates(len(missed)-len(unique))
+
+			self.calls += len(unique)
+			solutions = solutions.copy()
+			new_solutions, unique_evaluation = self._evaluate(fun_evaluation, solutions[unique], self._improve_mask(len(unique)))
+			solutions[missed] = new_solutions[inverse]
+			evaluation[missed] = unique_evaluation[inverse]
+
+			# solutions may be changed by local search
+			if self.local_search:
+				keys = [self.cache.key(solution) for solution in new_solutions]
+			else:
+				keys = [keys[i] for i in unique]
+
+			# penalty values are not cached
+			valid = self._valid_mask(len(new_solutions))
+			self.cache.update([key for key, v in zip(keys, valid) if v], unique_evaluation[valid])
+
+		return solutions, evaluation
+
+	def _evaluate(self, fun_evaluation, solutions, improve):
+		'''evaluate solutions, with local search on solutions specified by `improve`'''
+		solutions, evaluation, seconds = _evaluate(fun_evaluation, self.local_search, solutions, improve)
+		self.local_search_time += seconds
+		return solutions, evaluation
+
+	def _valid_mask(self, num):
+		'''solutions with real objective values in the last `_evaluate`, rather than penalty values'''
+		return np.ones(num, dtype=bool)
+
+	@property
+	def workers(self):
+		'''count of solutions evaluated at the same time'''
+		return 1
+
+	def submit(self, fun_evaluation, solutions):
+		'''
+		evaluate solutions without waiting for the result:
+			- return: Future of (solutions, evaluation), which is done already in current process
+		'''
+		future = Future()
+		try:
+			future.set_result(self.evaluate(fun_evaluation, solutions))
+		except Exception as e:
+			future.set_exception(e)
+		return future
+
+	def close(self):
+		'''release resources'''
+		pass
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
+
+
+# objective function and local search in worker process
+_worker = {}
+
+def _init_worker(fun_evaluation, local_search, events):
+	_worker['fun_evaluation'] = fun_evaluation
+	_worker['local_search'] = local_search
+	_worker['events'] = events
+	events.put(('pid', os.getpid()))
+
+def _evaluate_chunk(solutions, improve, task=None):
+	# report the start of a task, so that its timeout is counted from here rather than from submitting
+	if task is not None:
+		_worker['events'].put(('start', task))
+	return _evaluate(_worker['fun_evaluation'], _worker['local_search'], solutions, improve)
+
+def _evaluate_task(solutions, improve):
+	return _evaluate_chunk(solutions, improve)[:2]
+
+
+class ProcessPoolEvaluator(Evaluator):
+	'''
+	evaluate solutions in parallel with a process pool, which is kept alive across generations.
+	the objective function and local search are sent to each worker once when the pool starts,
+	so they should be picklable, e.g. module level functions or bound methods.
+	large problem data could be published with `SharedData`, which is attached by workers zero-copy.
+
+	stragglers are handled when evaluating a batch of solutions:
+		- speculative execution: once most tasks are done, the running tasks are submitted again
+		  to idle workers, and the first result is taken
+		- timeout: solutions of a task running longer than `timeout` seconds per solution get the
+		  `penalty` value, e.g. inf evaluation, which gets zero fitness by the default fitness function.
+		  the time is counted from the start of the task in a worker. workers stuck in such tasks are
+		  killed, and the pool is restarted
+	'''
+	def __init__(self, max_workers=None, chunksize=4, local_search=None, rate=1.0, shared_data=None, cache=None, delta=None, 
+					timeout=None, penalty=np.inf, speculative=None):
+		'''
+		- max_workers : count of worker processes, cpu count by default
+		- chunksize   : count of solutions submitted in one task
+		- local_search: optional function (solution, fun_evaluation) -> improved solution
+		- rate        : probability to apply local search on an individual
+		- shared_data : optional SharedData released with the evaluator, e.g. when GA.run() ends or crashes
+		- cache       : optional EvaluationCache, so that duplicated solutions are evaluated once
+		- delta       : optional function (solutions, move, params) -> change of objective values
+		- timeout     : optional max seconds to evaluate one solution
+		- penalty     : objective value of the solutions timed out
+		- speculative : optional fraction of done tasks in a batch, e.g. 0.9, to start speculative execution
+		'''
+		super().__init__(local_search, rate, cache, delta)
+		self.max_workers = max_workers
+		self.chunksize = chunksize
+		self.shared_data = shared_data
+		self.timeout = timeout
+		self.penalty = penalty
+		self.speculative = speculative
+		self._executor = None
+		self._fun_evaluation = None
+		self._events = None    # queue of (kind, value) reported by workers: ('pid', pid) or ('start', task)
+		self._pids = set()     # pids of workers
+		self._tasks = 0        # count of tasks submitted with timeout or speculative execution
+		self._timed_out = None # solutions timed out in the last batch
+		self._leftover = {}    # running future -> deadline, whose result is not required any more
+
+		# statistics
+		self.timeouts = 0      # count of tasks timed out
+		self.speculations = 0  # count of tasks submitted again
+		self.restarts = 0      # count of pool restarts to recycle stuck workers
+
+	def _start(self, fun_evaluation):
+		'''start process pool, or restart it when the objective function changes'''
+		if self._executor and self._fun_evaluation == fun_evaluation:
+			return
+		self._shutdown()
+		self._events = mp.Queue()
+		self._executor = ProcessPoolExecutor(self.max_workers, initializer=_init_worker, 
+					initargs=(fun_evaluation, self.local_search, self._events))
+		self._fun_evaluation = fun_evaluation
+
+	def _evaluate(self, fun_evaluation, solutions, improve):
+		self._timed_out = np.zeros(len(solutions), dtype=bool)
+		if not len(solutions):
+			return solutions, np.array([])
+
+		# recycle workers stuck in tasks of previous batches
+		self._check_leftover()
+		self._start(fun_evaluation)
+
+		# submit solutions in chunks
+		chunks = [(solutions[i:i+self.chunksize], improve[i:i+self.chunksize]) 
+					for i in range(0, len(solutions), self.chunksize)]
+		if self.timeout is None and self.speculative is None:
+			futures = [self._executor.submit(_evaluate_chunk, *chunk) for chunk in chunks]
+			results = [future.result() for future in futures]
+		else:
+			results = self._collect(chunks)
+
+		solutions = np.concatenate([res[0] for res in results])
+		evaluation = np.concatenate([res[1] for res in results])
+		self.local_search_time += sum(res[2] for res in results)
+		return solutions, evaluation
+
+	def _collect(self, chunks):
+		'''collect results of chunks, with timeout and speculative execution'''
+		results = [None]*len(chunks)
+		futures = {}       # future -> chunk index
+		tasks = {}         # task id -> future
+		started = {}       # future -> start time reported by worker
+		speculated = set() # chunks submitted again
+		remaining = len(chunks)
+		limit = lambda i: np.inf if self.timeout is None else self.timeout*len(chunks[i][0])
+
+		def submit(i):
+			self._tasks += 1
+			future = self._executor.submit(_evaluate_chunk, *chunks[i], self._tasks)
+			futures[future] = i
+			tasks[self._tasks] = future
+
+		for i in range(len(chunks)):
+			submit(i)
+
+		while remaining:
+			done, _ = wait(futures, timeout=0.01, return_when=FIRST_COMPLETED)
+			now = time.perf_counter()
+			for task in self._poll_events():
+				future = tasks.pop(task, None)
+				if future in futures: started[future] = now
+
+			for future in done:
+				i = futures.pop(future)
+				started.pop(future, None)
+				if results[i] is None:
+					results[i] = future.result()
+					remaining -= 1
+
+			# drop the other copies of done chunks
+			for future, i in list(futures.items()):
+				if results[i] is not None and not future.cancel():
+					self._leftover[future] = started.get(future, now) + limit(i)
+					del futures[future]
+					started.pop(future, None)
+
+			# penalty for the chunks whose copies are all running out of time
+			if self.timeout is not None:
+				for i in set(futures.values()):
+					copies = [future for future, j in futures.items() if j==i]
+					if all(future in started and now-started[future]>limit(i) for future in copies):
+						results[i] = (chunks[i][0], np.full(len(chunks[i][0]), self.penalty, dtype=float), 0.0)
+						remaining -= 1
+						self.timeouts += 1
+						start = i*self.chunksize
+						self._timed_out[start:start+len(chunks[i][0])] = True
+						for future in copies:
+							self._leftover[future] = started.pop(future) + limit(i)
+							del futures[future]
+
+			# submit running chunks again if workers are idle
+			if self.speculative is not None and remaining and len(chunks)-remaining>=self.speculative*len(chunks):
+				running = [i for future, i in futures.items() if future in started and not i in speculated]
+				idle = self.workers - len(futures)
+				for i in running[:max(idle, 0)]:
+					submit(i)
+					speculated.add(i)
+					self.speculations += 1
+
+		# workers stuck in timed out tasks could not be used any more
+		self._check_leftover()
+		return results
+
+	def _poll_events(self):
+		'''collect pids of new workers, and return ids of the tasks started since last polling'''
+		started = []
+		while self._events:
+			try:
+				kind, value = self._events.get_nowait()
+			except queue.Empty:
+				break
+			if kind=='pid':
+				self._pids.add(value)
+			else:
+				started.append(value)
+		return started
+
+	def _check_leftover(self):
+		'''kill workers if any task not required is running out of time'''
+		self._leftover = {future: deadline for future, deadline in self._leftover.items() if not future.done()}
+		now = time.perf_counter()
+		if any(now>deadline for deadline in self._leftover.values()):
+			self._kill()
+
+	def _valid_mask(self, num):
+		if self._timed_out is None or len(self._timed_out)!=num:
+			return np.ones(num, dtype=bool)
+		return ~self._timed_out
+
+	@property
+	def workers(self):
+		return self.max_workers or os.cpu_count()
+
+	def submit(self, fun_evaluation, solutions):
+		'''
+		submit solutions to the process pool as one task, without cache and timeout:
+			- return: Future of (solutions, evaluation)
+		'''
+		self._start(fun_evaluation)
+		self.calls += len(solutions)
+		return self._executor.submit(_evaluate_task, solutions, self._improve_mask(len(solutions)))
+
+	def _kill(self):
+		'''terminate worker processes, so the pool is restarted at next evaluation'''
+		if self._executor:
+			self._executor.shutdown(wait=False, cancel_futures=True)
+			# the pool is broken once a worker is terminated, then it reaps the other workers
+			self._poll_events()
+			for pid in self._pids:
+				try:
+					os.kill(pid, signal.SIGTERM)
+				except OSError: # exited already
+					pass
+			self.restarts += 1
+		self._close_events()
+		self._executor = None
+		self._fun_evaluation = None
+		self._leftover = {}
+
+	def _shutdown(self):
+		# do not wait for stuck workers
+		self._check_leftover()
+		if self._leftover and self.timeout is not None:
+			self._kill()
+		if self._executor:
+			self._executor.shutdown()
+		self._close_events()
+		self._executor = None
+		self._fun_evaluation = None
+
+	def _close_events(self):
+		if self._events:
+			self._events.close()
+			self._events.cancel_join_thread()
+		self._events = None
+		self._pids = set()
+
+	def close(self):
+		'''shutdown process pool and release shared data'''
+		self._shutdown()
+		if self.shared_data:
+			self.shared_data.close()
+			self.shared_data = None
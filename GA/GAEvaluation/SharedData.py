@@ -0,0 +1,107 @@
+#----------------------------------------------------------
+# Problem data shared with worker processes
+#----------------------------------------------------------
+import os
+import weakref
+import numpy as np
+from multiprocessing.shared_memory import SharedMemory
+
+
+def _release(shm, filename):
+	'''
+	remove name of the shared block or the memory-mapped file, so no more process could attach it.
+	the memory is freed when all arrays attached to it are deleted.
+	'''
+	if shm:
+		try:
+			shm.unlink()
+		except FileNotFoundError:
+			pass
+	if filename and os.path.exists(filename):
+		os.remove(filename)
+
+
+class SharedArray:
+	'''
+	numpy array published once for worker processes: only the name is pickled,
+	and the array is attached zero-copy when unpickled in worker process.
+		- shared memory block by default
+		- memory-mapped .npy file if `filename` is given
+	'''
+	def __init__(self, array, filename=None):
+		array = np.ascontiguousarray(array)
+		self.shape = array.shape
+		self.dtype = array.dtype
+		self.filename = filename
+
+		if filename:
+			np.save(filename, array)
+			self._shm = None
+		else:
+			self._shm = SharedMemory(create=True, size=max(array.nbytes, 1))
+			np.ndarray(self.shape, self.dtype, buffer=self._shm.buf)[...] = array
+
+		self._attach()
+
+		# the owner removes the data when closed, garbage collected or interpreter exits
+		self._finalizer = weakref.finalize(self, _release, self._shm, filename)
+
+	@property
+	def name(self):
+		return self.filename if self.filename else self._shm.name
+
+	def _attach(self):
+		if self.filename:
+			self.array = np.load(self.filename, mmap_mode='r')
+		else:
+			self.array = np.ndarray(self.shape, self.dtype, buffer=self._shm.buf)
+
+			# numpy does not hold the buffer, so unmap the block only when the array and its views are deleted
+			finalizer = weakref.finalize(self.array, self._shm.close)
+			finalizer.atexit = False
+
+	def __getstate__(self):
+		return {'name': self.name, 'shape': self.shape, 'dtype': self.dtype, 'filename': self.filename}
+
+	def __setstate__(self, state):
+		self.shape = state['shape']
+		self.dtype = state['dtype']
+		self.filename = state['filename']
+		self._shm = None if self.filename else SharedMemory(name=state['name'])
+		self._attach()
+		self.array.flags.writeable = False
+		self._finalizer = None # attached only, not the owner
+
+	def close(self):
+		'''release the data, only the owner removes it'''
+		if self._finalizer:
+			self._finalizer()
+
+
+class SharedData:
+	'''
+	collection of arrays shared with worker processes, e.g.
+		data = SharedData(distances=d, cities=c)
+		d = data['distances']
+	arrays are published in shared memory, or as memory-mapped .npy files under `directory`.
+	'''
+	def __init__(self, directory=None, **arrays):
+		self._arrays = {key: SharedArray(array, os.path.join(directory, key+'.npy') if directory else None)
+					for key, array in arrays.items()}
+
+	def __getitem__(self, key):
+		return self._arrays[key].array
+
+	def keys(self):
+		return self._arrays.keys()
+
+	def close(self):
+		'''release all shared arrays'''
+		for array in self._arrays.values():
+			array.close()
+
+	def __enter__(self):
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback):
+		self.close()
@@ -0,0 +1,3 @@
+from . import Evaluator
+from . import SharedData
+from . import Cache
@@ -0,0 +1,143 @@
+#----------------------------------------------------------
+# Island model: GA processes exchanging migrants
+#----------------------------------------------------------
+import queue
+import traceback
+import multiprocessing as mp
+import numpy as np
+
+
+def ring(index, num, epoch, rng):
+	'''send migrants to the next island'''
+	return [(index+1)%num]
+
+def fully_connected(index, num, epoch, rng):
+	'''send migrants to all other islands'''
+	return [i for i in range(num) if i!=index]
+
+def random_target(index, num, epoch, rng):
+	'''send migrants to a random other island'''
+	target = int(rng.integers(num-1))
+	return [target if target<index else target+1]
+
+TOPOLOGIES = {
+	'ring'  : ring,
+	'full'  : fully_connected,
+	'random': random_target
+}
+
+
+def _run_island(index, ga, fun_evaluation, gen, interval, migrants, topology, inboxes, results, seed):
+	'''evolve one island in a worker process, and put (index, solution, evaluation, error) to results'''
+	# migrants left in queues are useless once the island ends
+	for inbox in inboxes:
+		inbox.cancel_join_thread()
+
+	# independent random streams of islands, and the global random state for legacy code
+	ga.rng = seed
+	np.random.seed(seed.generate_state(4))
+	population = ga.population
+	num = len(inboxes)
+	early = [] # messages of later epochs from faster islands
+	try:
+		population.initialize()
+		for n in range(1, gen+1):
+			ga.evolve(fun_evaluation, n, gen)
+			if n%interval or n==gen:
+				continue
+
+			# send copies of the best individuals as arrays to the targets, and an empty message
+			# to the other islands, so that each island knows when all migrants of this epoch arrive
+			epoch = n//interval
+			population.evaluate(fun_evaluation, ga.fun_fitness)
+			solutions, evaluation = population.emigrants(migrants)
+			targets = set(topology(index, num, epoch, ga.rng))
+			for i in range(num):
+				if i==index: continue
+				inboxes[i].put((epoch, index, (solutions, evaluation) if i in targets else None))
+
+			# wait for the messages of this epoch from all other islands,
+			# and apply migrants in the order of source islands to be reproducible
+			messages, early = [m for m in early if m[0]==epoch], [m for m in early if m[0]!=epoch]
+			while len(messages)<num-1:
+				message = inboxes[index].get()
+				(messages if message[0]==epoch else early).append(message)
+			for _, source, migrated in sorted(messages, key=lambda m: m[1]):
+				if migrated: population.immigrate(*migrated)
+
+		population.evaluate(fun_evaluation, ga.fun_fitness)
+		best = population.best
+		results.put((index, best.solution, best.evaluation, None))
+	except Exception:
+		results.put((index, None, None, traceback.format_exc()))
+	finally:
+		population.evaluator.close()
+
+
+class IslandGA:
+	'''
+	island model GA: each GA instance evolves its own population in a separate process,
+	and copies of the top individuals migrate to other islands every `interval` generations.
+	'''
+	def __init__(self, islands, topology='ring', interval=10, migrants=2, seed=None):
+		'''
+		- islands : list of GA instances, with own population and operators
+		- topology: 'ring', 'full', 'random', or function (index, num, epoch, rng) -> indexes of target islands,
+		            where rng is the np.random.Generator of the sending island
+		- interval: count of generations between migrations
+		- migrants: count of the best individuals sent to each target island
+		- seed    : seed of SeedSequence, which spawns an independent random stream for each island
+		'''
+		if len(islands)<2:
+			raise ValueError('at least two islands are required')
+		self.islands = islands
+		self.topology = TOPOLOGIES[topology] if isinstance(topology, str) else topology
+		self.interval = interval
+		self.migrants = migrants
+		self.seed = seed
+		self.results = None # (solution, evaluation) of the best individual in each island
+
+	def run(self, fun_evaluation, gen=50):
+		'''
+		evolve all islands for `gen` generations and return the global best individual.
+		the objective function should be picklable if processes are not forked.
+		'''
+		num = len(self.islands)
+		seeds = np.random.SeedSequence(self.seed).spawn(num)
+		inboxes = [mp.Queue() for i in range(num)]
+		results = mp.Queue()
+		processes = [mp.Process(target=_run_island, args=(i, ga, fun_evaluation, gen, self.interval,
+						self.migrants, self.topology, inboxes, results, seeds[i])) for i, ga in enumerate(self.islands)]
+
+		try:
+			for p in processes:
+				p.start()
+			self.results = self._collect(results, processes)
+		finally:
+			for p in processes:
+				if p.pid is None: continue # not started
+				if p.is_alive(): p.terminate()
+				p.join()
+
+		# global best
+		pos = int(np.argmin([evaluation for solution, evaluation in self.results]))
+		solution, evaluation = self.results[pos]
+		best = self.islands[pos].population.individual.from_solution(solution)
+		best.evaluation = evaluation
+		return best
+
+	@staticmethod
+	def _collect(results, processes):
+		'''collect results of all islands, raise error if any island fails'''
+		collected = [None]*len(processes)
+		while any(res is None for res in collected):
+			try:
+				index, solution, evaluation, error = results.get(timeout=0.1)
+			except queue.Empty:
+				if any(res is None and p.exitcode for res, p in zip(collected, processes)):
+					raise RuntimeError('island process exited unexpectedly')
+				continue
+			if error:
+				raise RuntimeError('island {0} failed:\n{1}'.format(index, error))
+			collected[index] = (solution, evaluation)
+		return collected
@@ -0,0 +1,111 @@
+#----------------------------------------------------------
+# Instrumentation of GA process
+#----------------------------------------------------------
+import json
+import time
+import tracemalloc
+
+
+class Monitor:
+	'''
+	per-generation statistics of a GA process, which are passed as a dict to each observer, e.g.
+		records = []
+		g = GA(P, S, C, M, monitor=Monitor(records.append, JSONLSink('run.jsonl'), memory=True))
+	keys of the dict:
+		- generation
+		- evaluate, select, cross, mutate: wall time of each phase in seconds
+		- local_search: seconds spent on local search, summed over workers
+		- calls       : count of solutions evaluated by objective function
+		- cache_hit_rate: hit rate of evaluation cache in this generation, None without cache
+		- best, mean  : best and mean evaluation of the population once evaluated
+		- peak_memory : peak traced memory in bytes, only if `memory` is True
+	'''
+	PHASES = ('evaluate', 'select', 'cross', 'mutate')
+
+	def __init__(self, *observers, memory=False):
+		'''
+		- observers: functions called with the record of each generation
+		- memory   : trace peak memory with tracemalloc, which slows down the process
+		'''
+		self.observers = observers
+		self.memory = memory
+		self._tracing = False
+		self._times = dict.fromkeys(self.PHASES, 0.0)
+		self._start = 0.0
+		self._counters = None
+		self._evaluation = (None, None)
+
+	def begin(self, ga):
+		'''called when the GA process starts'''
+		self._counters = self._read_counters(ga.population.evaluator)
+		if self.memory and not tracemalloc.is_tracing():
+			tracemalloc.start()
+			self._tracing = True
+
+	def end(self):
+		'''called when the GA process ends'''
+		if self._tracing:
+			tracemalloc.stop()
+			self._tracing = False
+		for observer in self.observers:
+			if hasattr(observer, 'close'): observer.close()
+
+	def start(self, phase):
+		self._start = time.perf_counter()
+
+	def stop(self, phase):
+		self._times[phase] += time.perf_counter() - self._start
+
+	def evaluated(self, population):
+		'''called when the population is evaluated'''
+		statistics = population.statistics
+		self._evaluation = (float(statistics.best), float(statistics.mean))
+
+	def record(self, ga, n):
+		'''create the record of generation n, and pass it to observers'''
+		evaluator = ga.population.evaluator
+		if self._counters is None:
+			self._counters = self._read_counters(evaluator)
+		counters = self._read_counters(evaluator)
+		calls, local_search, hits, misses = [now-last for now, last in zip(counters, self._counters)]
+		self._counters = counters
+
+		record = {'generation': n}
+		record.update(self._times)
+		record['local_search'] = local_search
+		record['calls'] = calls
+		record['cache_hit_rate'] = hits/(hits+misses) if hits+misses else None
+		record['best'], record['mean'] = self._evaluation
+		if self.memory and tracemalloc.is_tracing():
+			record['peak_memory'] = tracemalloc.get_traced_memory()[1]
+			tracemalloc.reset_peak()
+
+		self._times = dict.fromkeys(self.PHASES, 0.0)
+		for observer in self.observers:
+			observer(record)
+
+	@staticmethod
+	def _read_counters(evaluator):
+		cache = evaluator.cache
+		return (evaluator.calls, evaluator.local_search_time,
+				cache.hits if cache is not None else 0, cache.misses if cache is not None else 0)
+
+
+class JSONLSink:
+	'''observer writing each record as a line of JSON'''
+	def __init__(self, filename, mode='w'):
+		self.filename = filename
+		self.mode = mode
+		self._file = None
+
+	def __call__(self, record):
+		if not self._file:
+			self._file = open(self.filename, self.mode)
+			self.mode = 'a' # append when reopened, e.g. resumed process
+		self._file.write(json.dumps(record) + '\n')
+		self._file.flush()
+
+	def close(self):
+		if self._file:
+			self._file.close()
+		self._file = None
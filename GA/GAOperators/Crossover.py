@@ -2,10 +2,9 @@
 # GA Operator: crossover
 #----------------------------------------------------------
 import numpy as np
-import copy
 from .Operators import Crossover
 from GA.GAPopulation.DecimalIndividual import DecimalFloatIndividual, DecimalIntegerIndividual
-from GA.GAPopulation.SequenceIndividual import UniqueSeqIndividual, UniqueLoopIndividual, ZeroOneSeqIndividual
+from GA.GAPopulation.SequenceIndividual import UniqueSeqIndividual, UniqueLoopIndividual, ZeroOneSeqIndividual, PackedZeroOneSeqIndividual
 
 class DecimalCrossover(Crossover):
 	'''
@@ -29,19 +28,22 @@ class DecimalCrossover(Crossover):
 			- alpha: linear ratio to interpolate two genes, exchange two genes if alpha is 0.0
 		'''
 
-		# cross value
-		temp = (individual_b.solution-individual_a.solution)*pos*(1-alpha)
-		new_value_a = individual_a.solution + temp
-		new_value_b = individual_b.solution - temp
+		new_value_a, new_value_b = DecimalCrossover.cross_solutions(individual_a.solution, individual_b.solution, pos, alpha)
 
 		# return new individuals
-		new_individual_a = individual_a.__class__(individual_a.ranges)
-		new_individual_b = individual_b.__class__(individual_b.ranges)
+		return individual_a.from_solution(new_value_a), individual_b.from_solution(new_value_b)
 
-		new_individual_a.solution = new_value_a
-		new_individual_b.solution = new_value_b
+	@staticmethod
+	def cross_solutions(solution_a, solution_b, pos, alpha):
+		'''linear interpolation between two solutions at positions `pos`'''
+		# cross value
+		temp = (solution_b-solution_a)*pos*(1-alpha)
+		return solution_a + temp, solution_b - temp
 
-		return new_individual_a, new_individual_b
+	def cross_matrix(self, solutions_a, solutions_b, alpha):
+		'''linear interpolation for all pairs at one time with a matrix of crossing positions'''
+		pos = self._cross_positions_matrix(*solutions_a.shape)
+		return self.cross_solutions(solutions_a, solutions_b, pos, alpha)
 	
 
 class SequencePMXCrossover(Crossover):
@@ -66,31 +68,39 @@ class SequencePMXCrossover(Crossover):
 			- pos  : 0-1 vector to specify positions for crossing
 			- alpha: not used
 		'''
-		solution_a = individual_a.solution.copy()
-		solution_b = individual_b.solution.copy()
+		solution_a, solution_b = SequencePMXCrossover.cross_solutions(individual_a.solution, individual_b.solution, pos, alpha)
 
-		# elements to be exchanged
-		exchange_a, exchange_b = solution_a[pos], solution_b[pos]
+		# return new individuals
+		return individual_a.from_solution(solution_a), individual_b.from_solution(solution_b)
 
-		# unique elements among the exchanged elements
-		diff_a = exchange_a[~np.isin(exchange_a, exchange_b)]
-		diff_b = exchange_b[~np.isin(exchange_b, exchange_a)]
+	@staticmethod
+	def cross_solutions(solution_a, solution_b, pos, alpha):
+		'''
+		exchange genes at positions `pos` and fix the duplicated genes.
+		pairs stored in rows of solutions matrix are crossed at one time, 
+		in which case `pos` is a matrix of positions as well.
+		'''
+		A, B, P = np.atleast_2d(solution_a, solution_b, pos)
 
-		# fix the duplicated elements
-		solution_a[np.isin(solution_a, diff_b)] = diff_a
-		solution_b[np.isin(solution_b, diff_a)] = diff_b
+		# whether the gene of one solution is in the exchanged segment of the other one
+		a_in_b = np.take_along_axis(_segment_values(B, P), A, axis=1)
+		b_in_a = np.take_along_axis(_segment_values(A, P), B, axis=1)
 
-		# exchange specified elements finally
-		solution_a[pos], solution_b[pos] = solution_b[pos], solution_a[pos]
+		# fix the duplicated elements out of the segment with 
+		# the unique elements in the segment in order
+		child_a, child_b = A.copy(), B.copy()
+		child_a[~P & a_in_b] = A[P & ~a_in_b]
+		child_b[~P & b_in_a] = B[P & ~b_in_a]
 
-		# return new individuals
-		new_individual_a = individual_a.__class__(individual_a.ranges)
-		new_individual_b = individual_b.__class__(individual_b.ranges)
+		# exchange specified elements finally
+		child_a[P], child_b[P] = B[P], A[P]
 
-		new_individual_a.solution = solution_a
-		new_individual_b.solution = solution_b
+		return child_a.reshape(solution_a.shape), child_b.reshape(solution_b.shape)
 
-		return new_individual_a, new_individual_b
+	def cross_matrix(self, solutions_a, solutions_b, alpha):
+		'''cross all pairs at one time with a matrix of crossing positions'''
+		pos = self._cross_positions_matrix(*solutions_a.shape)
+		return self.cross_solutions(solutions_a, solutions_b, pos, alpha)
 
 
 class SequenceOXCrossover(Crossover):
@@ -115,21 +125,162 @@ class SequenceOXCrossover(Crossover):
 			- pos  : 0-1 vector to specify positions for crossing
 			- alpha: not used
 		'''
-		solution_a = individual_a.solution
-		solution_b = individual_b.solution
+		solution_a, solution_b = SequenceOXCrossover.cross_solutions(individual_a.solution, individual_b.solution, pos, alpha)
+
+		# return new individuals
+		return individual_a.from_solution(solution_a), individual_b.from_solution(solution_b)
+
+	@staticmethod
+	def cross_solutions(solution_a, solution_b, pos, alpha):
+		'''
+		put the exchanged genes ahead and keep the order of the rest genes.
+		pairs stored in rows of solutions matrix are crossed at one time, 
+		in which case `pos` is a matrix of positions as well.
+		'''
+		A, B, P = np.atleast_2d(solution_a, solution_b, pos)
+		return _order_cross(A, B, P).reshape(solution_a.shape), _order_cross(B, A, P).reshape(solution_b.shape)
+
+	def cross_matrix(self, solutions_a, solutions_b, alpha):
+		'''cross all pairs at one time with a matrix of crossing positions'''
+		pos = self._cross_positions_matrix(*solutions_a.shape)
+		return self.cross_solutions(solutions_a, solutions_b, pos, alpha)
 
-		# elements to be exchanged
-		exchange_a, exchange_b = solution_a[pos], solution_b[pos]
 
-		# unique elements
-		unique_a = solution_a[~np.isin(solution_a, exchange_b)]
-		unique_b = solution_b[~np.isin(solution_b, exchange_a)]
+class ZeroOneTwoPointCrossover(Crossover):
+	'''
+	two-point crossover for 0-1 sequence individuals, packed or not:
+	exchange genes between two random cut points. packed solutions are crossed
+	with bitwise operations on bytes, without unpacking
+	'''
+	def __init__(self, rate=0.8):
+		'''
+		crossover operation:
+			- rate: propability of crossover. adaptive rate when it is a list, e.g. [0.6,0.9]
+		'''
+		super().__init__(rate)
+		self._individual_class = [ZeroOneSeqIndividual, PackedZeroOneSeqIndividual]
+		self._packed = False # whether solutions crossed by `cross_matrix()` are packed
+		self._length = None  # count of genes of the packed solutions
+
+	@staticmethod
+	def cross_individuals(individual_a, individual_b, pos, alpha):
+		'''
+		exchange genes of two 0-1 sequence individuals:
+			- pos  : 0-1 vector to specify positions for crossing
+			- alpha: not used
+		'''
+		solution_a, solution_b = ZeroOneTwoPointCrossover.cross_solutions(individual_a.solution, individual_b.solution, pos, alpha)
 
 		# return new individuals
-		new_individual_a = individual_a.__class__(individual_a.ranges)
-		new_individual_b = individual_b.__class__(individual_b.ranges)
+		return individual_a.from_solution(solution_a), individual_b.from_solution(solution_b)
+
+	@staticmethod
+	def cross_solutions(solution_a, solution_b, pos, alpha):
+		'''
+		exchange genes at positions `pos`: child = a ^ ((a^b) & pos).
+		`pos` is packed first if the solutions are packed.
+		'''
+		if pos.shape[-1]!=solution_a.shape[-1]:
+			pos = np.packbits(pos, axis=-1)
+		diff = (solution_a ^ solution_b) & pos.astype(solution_a.dtype)
+		return solution_a ^ diff, solution_b ^ diff
+
+	def cross_rows(self, population, pos_a, pos_b):
+		# solutions are packed or not by the individual class, while unpacked ones could be uint8 as well
+		self._packed = isinstance(population.individual, PackedZeroOneSeqIndividual)
+		self._length = population.individual.dimension
+		return super().cross_rows(population, pos_a, pos_b)
+
+	def cross_matrix(self, solutions_a, solutions_b, alpha):
+		'''
+		cross all pairs at one time with a matrix of crossing positions,
+		which are packed if the individuals of the population crossed by `cross_rows()` are packed
+		'''
+		num, width = solutions_a.shape
+		packed = self._packed
+		pos = self._cross_masks(num, self._length if packed else width, width, packed)
+		return self.cross_solutions(solutions_a, solutions_b, pos, alpha)
+
+	def _cross_positions_matrix(self, num, dimension):
+		'''0-1 matrix of positions for `num` pairs'''
+		return self._cross_masks(num, dimension, dimension, False)
+
+	def _cross_masks(self, num, length, width, packed):
+		'''
+		masks of positions for `num` pairs of `length` genes: genes in [start, end) between two random cut points.
+		packed masks of `width` bytes if `packed`, otherwise 0-1 matrix of `width` columns.
+		'''
+		cuts = np.sort(self.rng.integers(length+1, size=(num, 2)), axis=1)
+		return _segment_masks(cuts[:,0], cuts[:,1], width, packed)
+
+
+class ZeroOneOnePointCrossover(ZeroOneTwoPointCrossover):
+	'''
+	one-point crossover for 0-1 sequence individuals, packed or not:
+	exchange genes after a random cut point
+	'''
+	def _cross_masks(self, num, length, width, packed):
+		'''masks of positions for `num` pairs: genes in [cut, length)'''
+		cut = self.rng.integers(1, length, size=num)
+		return _segment_masks(cut, np.full(num, length), width, packed)
+
+
+class ZeroOneUniformCrossover(ZeroOneTwoPointCrossover):
+	'''
+	uniform crossover for 0-1 sequence individuals, packed or not:
+	exchange each gene with probability 0.5
+	'''
+	def _cross_masks(self, num, length, width, packed):
+		'''masks of random positions for `num` pairs, random bytes directly if `packed`'''
+		if packed: # unused bits of the last byte are 0 in both parents, so nothing is exchanged there
+			return self.rng.integers(256, size=(num, width), dtype=np.uint8)
+		return self.rng.random((num, width)) < 0.5
+
+
+def _segment_masks(start, end, width, packed):
+	'''
+	masks of positions in [start[i], end[i]) for each row of `width` columns, which are built
+	as bytes directly if `packed`, i.e. prefix(end) ^ prefix(start)
+	'''
+	if not packed:
+		index = np.arange(width)
+		return (index>=start[:,None]) & (index<end[:,None])
+
+	def prefix(k):
+		# bytes before k//8 are full, the byte at k//8 has the highest k%8 bits set
+		index, k = np.arange(width), k[:,None]
+		return np.where(index<k//8, 0xFF, np.where(index==k//8, (0xFF00 >> (k%8)) & 0xFF, 0)).astype(np.uint8)
+
+	return prefix(end) ^ prefix(start)
+
+
+def _segment_values(solutions, pos):
+	'''
+	0-1 matrix indexed by gene value: True if the gene is at the specified positions,
+	i.e. scatter `pos` with the inverse permutation of each row
+	'''
+	res = np.empty(solutions.shape, dtype=bool)
+	np.put_along_axis(res, solutions, pos, axis=1)
+	return res
+
+
+def _order_cross(A, B, P):
+	'''
+	child of order crossover for each row: exchanged genes of B ahead, 
+	then the rest genes of A in order
+	'''
+	# genes of A in the exchanged segment of B
+	a_in_b = np.take_along_axis(_segment_values(B, P), A, axis=1)
+
+	# position of each gene in B
+	index = np.empty(B.shape, dtype=np.intp)
+	np.put_along_axis(index, B, np.arange(B.shape[1])[None,:], axis=1)
 
-		new_individual_a.solution = np.concatenate((exchange_b, unique_a))
-		new_individual_b.solution = np.concatenate((exchange_a, unique_b))
+	# target position of each gene of A in child
+	start = np.argmax(P, axis=1)[:,None]
+	count = P.sum(axis=1)[:,None]
+	dest = np.where(a_in_b, np.take_along_axis(index, A, axis=1)-start, count+np.cumsum(~a_in_b, axis=1)-1)
 
-		return new_individual_a, new_individual_b
\ No newline at end of file
+	child = np.empty_like(A)
+	np.put_along_axis(child, dest, A, axis=1)
+	return child
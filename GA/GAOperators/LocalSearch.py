@@ -0,0 +1,142 @@
+#----------------------------------------------------------
+# Local search for sequence loop, e.g. tour of TSP
+#----------------------------------------------------------
+import time
+from collections import deque
+import numpy as np
+
+
+class NeighborListLocalSearch:
+	'''
+	2-opt and Or-opt local search for a loop sequence, e.g. tour of TSP:
+		- only the k nearest neighbors of a city are candidates to be connected
+		- don't-look bits: only cities around an applied move are checked again
+		- gain of a move is calculated in O(1) with distances of the changed edges
+	it is called with (solution, fun_evaluation) and returns the improved solution,
+	so it could be the `local_search` of an Evaluator, e.g.
+		Evaluator(local_search=NeighborListLocalSearch(neighbors, distance), rate=0.3)
+	'''
+	def __init__(self, neighbors, distance, or_opt=3, max_moves=None, time_limit=None, eps=1e-10):
+		'''
+		- neighbors : (dimension, k) matrix, nearest neighbors of each city sorted by distance
+		- distance  : function (i, j) -> distance between city i and j
+		- or_opt    : max length of segment moved by Or-opt, 0 to disable Or-opt
+		- max_moves : max count of improving moves for each solution
+		- time_limit: max seconds for each solution
+		- eps       : minimum gain of an improving move
+		'''
+		self.neighbors = np.asarray(neighbors).tolist()
+		self.distance = distance
+		self.or_opt = or_opt
+		self.max_moves = max_moves
+		self.time_limit = time_limit
+		self.eps = eps
+
+	def __call__(self, solution, fun_evaluation=None):
+		'''improve the solution until no improving move or the budget is exhausted'''
+		tour = solution.tolist()
+		pos = [0]*len(tour)
+		for i, city in enumerate(tour):
+			pos[city] = i
+
+		# don't-look bits: cities in queue are to be checked
+		queue = deque(tour)
+		active = [True]*len(tour)
+
+		moves = 0
+		deadline = time.perf_counter()+self.time_limit if self.time_limit else None
+		while queue:
+			if self.max_moves is not None and moves>=self.max_moves: break
+			if deadline and time.perf_counter()>deadline: break
+
+			city = queue.popleft()
+			active[city] = False
+
+			# reset don't-look bits of the cities at the changed edges
+			changed = self._two_opt(city, tour, pos) or self._or_opt(city, tour, pos)
+			if not changed: continue
+			moves += 1
+			for c in changed:
+				if not active[c]:
+					active[c] = True
+					queue.append(c)
+
+		return np.array(tour, dtype=solution.dtype)
+
+	def _two_opt(self, a, tour, pos):
+		'''
+		2-opt move connecting city a to a near city c:
+			- a b ... c e -> a c ... b e, or
+			- e c ... b a -> e b ... c a
+		return the end cities of changed edges, or None if no improving move
+		'''
+		d, n = self.distance, len(tour)
+		for forward in (True, False):
+			step = 1 if forward else -1
+			b = tour[(pos[a]+step)%n]
+			d_ab = d(a, b)
+			for c in self.neighbors[a]:
+				g1 = d_ab - d(a, c)
+				if g1<=self.eps: break # neighbors are sorted
+				e = tour[(pos[c]+step)%n]
+				if c==b or e==a: continue
+				if g1 + d(c, e) - d(b, e) > self.eps:
+					if forward:
+						self._reverse(tour, pos, pos[b], pos[c])
+					else:
+						self._reverse(tour, pos, pos[c], pos[b])
+					return (a, b, c, e)
+		return None
+
+	def _or_opt(self, a, tour, pos):
+		'''
+		Or-opt move: segment s1...s2 starting from city a is moved between a near city c and its neighbor e
+		return the end cities of changed edges, or None if no improving move
+		'''
+		d, n = self.distance, len(tour)
+		for length in range(1, min(self.or_opt, n-3)+1):
+			i = pos[a]
+			segment = [tour[(i+k)%n] for k in range(length)]
+			s1, s2 = segment[0], segment[-1]
+			p, q = tour[(i-1)%n], tour[(i+length)%n]
+			removed = d(p, s1) + d(s2, q) - d(p, q)
+			if removed<=self.eps: continue
+
+			for c in self.neighbors[s1]:
+				if removed - d(c, s1)<=self.eps: break # neighbors are sorted
+				if c in segment: continue
+
+				# c s1...s2 e
+				e = tour[(pos[c]+1)%n]
+				if not e in segment and removed - (d(c, s1) + d(s2, e) - d(c, e))>self.eps:
+					self._move_segment(tour, pos, segment, c, False)
+					return (p, q, s1, s2, c, e)
+
+				# e s2...s1 c
+				e = tour[(pos[c]-1)%n]
+				if not e in segment and removed - (d(e, s2) + d(s1, c) - d(e, c))>self.eps:
+					self._move_segment(tour, pos, segment, e, True)
+					return (p, q, s1, s2, c, e)
+		return None
+
+	@staticmethod
+	def _reverse(tour, pos, i, j):
+		'''reverse the loop segment from position i to j forward, or the complementary one if shorter'''
+		n = len(tour)
+		length = (j-i)%n + 1
+		if 2*length > n: # same loop by reversing the complementary segment
+			i, j, length = (j+1)%n, (i-1)%n, n-length
+		for k in range(length//2):
+			x, y = (i+k)%n, (j-k)%n
+			tour[x], tour[y] = tour[y], tour[x]
+			pos[tour[x]], pos[tour[y]] = x, y
+
+	@staticmethod
+	def _move_segment(tour, pos, segment, c, reverse):
+		'''insert the segment after city c, reversed or not'''
+		skip = set(segment)
+		rest = [city for city in tour if not city in skip]
+		k = rest.index(c)+1
+		tour[:] = rest[:k] + (segment[::-1] if reverse else segment) + rest[k:]
+		for i, city in enumerate(tour):
+			pos[city] = i
@@ -4,7 +4,7 @@
 import numpy as np
 from .Operators import Mutation
 from GA.GAPopulation.DecimalIndividual import DecimalFloatIndividual, DecimalIntegerIndividual
-from GA.GAPopulation.SequenceIndividual import UniqueSeqIndividual, UniqueLoopIndividual, ZeroOneSeqIndividual
+from GA.GAPopulation.SequenceIndividual import UniqueSeqIndividual, UniqueLoopIndividual, ZeroOneSeqIndividual, PackedZeroOneSeqIndividual
 
 class DecimalMutation(Mutation):
 	'''
@@ -21,30 +21,38 @@ class DecimalMutation(Mutation):
 		# this operator is only available for DecimalIndividual
 		self._individual_class = [DecimalFloatIndividual, DecimalIntegerIndividual]
 
-	@staticmethod
-	def mutate_individual(individual, positions, alpha, fun_evaluation=None):
+	def mutate_individual(self, individual, positions, alpha, fun_evaluation=None):
 		'''
 		mutation method for decimal encoded individual:
 		to add a random deviation for gene in specified positions
 		- positions: 0-1 vector to specify positions for crossing
 		- alpha: mutatation magnitude
 		'''
+		return self.mutate_solution(individual.solution, individual.ranges, positions, alpha)
 
+	def mutate_solution(self, solution, ranges, positions, alpha):
+		'''
+		to add a random deviation for gene in specified positions
+		- ranges: element ranges of solution, [(lb1, ub1), (lb2, ub2), ...]
+		'''
 		# for a gene G in range [L, U],
 		# option 0: G = G + (U-G)*alpha
 		# option 1:	G = G + (L-G)*alpha	
 
 		# mutation options:
-		p = np.random.choice(2,individual.dimension)
+		p = self.rng.integers(2, size=solution.shape)
 
 		# lower/upper bound
-		L, U = individual.ranges[:,0], individual.ranges[:,1]
+		L, U = ranges[:,0], ranges[:,1]
 		
 		# combine two mutation method
-		diff = ((U-individual.solution)-p*(U-L))*positions*alpha
-		solution = individual.solution + diff
+		diff = ((U-solution)-p*(U-L))*positions*alpha
+		return solution + diff
 
-		return solution			
+	def mutate_matrix(self, solutions, ranges, alpha):
+		'''bounded mutation for all solutions at one time with a matrix of mutation positions'''
+		pos = self._mutate_positions_matrix(*solutions.shape)
+		return self.mutate_solution(solutions, ranges, pos, alpha)
 		
 
 
@@ -53,6 +61,8 @@ class UniqueSeqMutation(Mutation):
 	mutation operation for unique sequence individuals:
 	exchange genes at random positions
 	'''
+	move = 'reverse'
+
 	def __init__(self, rate):
 		'''
 		mutation operation:
@@ -64,16 +74,6 @@ class UniqueSeqMutation(Mutation):
 		self._individual_class = [UniqueSeqIndividual, UniqueLoopIndividual]
 
 
-	@staticmethod
-	def _mutate_positions(dimension):
-		'''select random and continuous positions'''
-		# start, end position
-		pos = np.random.choice(dimension, 2, replace=False)
-		start, end = pos.min(), pos.max()
-		positions = np.zeros(dimension).astype(np.bool)
-		positions[start:end+1] = True
-		return positions
-
 	@staticmethod
 	def mutate_individual(individual, positions, alpha):
 		'''
@@ -81,6 +81,115 @@ class UniqueSeqMutation(Mutation):
 		- positions: 0-1 vector to specify positions
 		- alpha: probability to accept a worse solution
 		'''
-		solution = individual.solution.copy()		
-		solution[positions] = solution[positions][::-1] # reverse genes at specified positions
-		return solution
\ No newline at end of file
+		return UniqueSeqMutation.mutate_solution(individual.solution, individual.ranges, positions, alpha)
+
+	def _mutate_positions_matrix(self, num, dimension):
+		'''select random and continuous positions for `num` solutions at one time: one row of positions per solution'''
+		# two different positions for each row
+		start = self.rng.integers(dimension, size=num)
+		end = self.rng.integers(dimension-1, size=num)
+		end += end>=start
+		start, end = np.minimum(start, end), np.maximum(start, end)
+		index = np.arange(dimension)
+		return (index>=start[:,None]) & (index<=end[:,None])
+
+	@staticmethod
+	def move_params(positions):
+		'''(start, end) of the reversed genes for each row of positions'''
+		start = np.argmax(positions, axis=1)
+		end = positions.shape[1]-1-np.argmax(positions[:,::-1], axis=1)
+		return np.stack((start, end), axis=1)
+
+	@staticmethod
+	def mutate_solution(solution, ranges, positions, alpha):
+		'''
+		reverse genes at specified continuous positions.
+		solutions stored in rows of matrix are mutated at one time,
+		in which case `positions` is a matrix as well.
+		'''
+		S, P = np.atleast_2d(solution, positions)
+
+		# reverse index in range [start, end]: start+end-i
+		start = np.argmax(P, axis=1)[:,None]
+		end = S.shape[1]-1-np.argmax(P[:,::-1], axis=1)[:,None]
+		index = np.arange(S.shape[1])[None,:]
+		index = np.where(P, start+end-index, index)
+
+		return np.take_along_axis(S, index, axis=1).reshape(solution.shape)
+
+	def mutate_matrix(self, solutions, ranges, alpha):
+		'''reverse genes for all solutions at one time with a matrix of mutation positions'''
+		pos = self._mutate_positions_matrix(*solutions.shape)
+		return self.mutate_solution(solutions, ranges, pos, alpha)
+
+
+class ZeroOneFlipMutation(Mutation):
+	'''
+	bit-flip mutation for 0-1 sequence individuals, packed or not:
+	flip genes at random positions. packed solutions are flipped with
+	bitwise operations on bytes, without unpacking
+	'''
+	def __init__(self, rate, flip_rate=None):
+		'''
+		mutation operation:
+		rate     : propability of mutation, [0,1]
+		flip_rate: propability to flip each gene of a mutated individual, 1/length by default.
+		           at least one gene is flipped.
+		'''
+		super().__init__(rate)
+		self._flip_rate = flip_rate
+
+		# this operator is only available for 0-1 sequence individuals
+		self._individual_class = [ZeroOneSeqIndividual, PackedZeroOneSeqIndividual]
+
+	def _mutate_positions_matrix(self, num, dimension):
+		'''0-1 matrix of positions to flip for `num` solutions'''
+		return self._flip_masks(num, dimension, dimension, False)
+
+	@staticmethod
+	def mutate_individual(individual, positions, alpha):
+		'''
+		flip genes at specified positions:
+		- positions: 0-1 vector to specify positions
+		- alpha: not used
+		'''
+		return ZeroOneFlipMutation.mutate_solution(individual.solution, individual.ranges, positions, alpha)
+
+	@staticmethod
+	def mutate_solution(solution, ranges, positions, alpha):
+		'''
+		flip genes at specified positions, which are packed first if the solution is packed.
+		solutions stored in rows of matrix are mutated at one time,
+		in which case `positions` is a matrix as well.
+		'''
+		if positions.shape[-1]!=solution.shape[-1]:
+			positions = np.packbits(positions, axis=-1)
+		return solution ^ positions.astype(solution.dtype)
+
+	def mutate_matrix(self, solutions, ranges, alpha):
+		'''
+		flip genes for all solutions at one time with a matrix of masks, which are packed
+		if the solutions are packed, i.e. fewer columns than the `ranges` genes
+		'''
+		packed = solutions.shape[1]<ranges
+		pos = self._flip_masks(solutions.shape[0], ranges, solutions.shape[1], packed)
+		return solutions ^ pos.astype(solutions.dtype)
+
+	def _flip_masks(self, num, length, width, packed):
+		'''
+		masks of positions to flip for `num` solutions of `length` genes: the count of flips
+		of each row follows the binomial distribution, so only the flipped positions are drawn.
+		packed masks of `width` bytes if `packed`, otherwise 0-1 matrix of `width` columns.
+		'''
+		flip_rate = self._flip_rate or 1.0/length
+		count = np.maximum(self.rng.binomial(length, flip_rate, size=num), 1)
+		rows = np.repeat(np.arange(num), count)
+		index = self.rng.integers(length, size=rows.size)
+
+		if not packed:
+			masks = np.zeros((num, width), dtype=bool)
+			masks[rows, index] = True
+		else:
+			masks = np.zeros((num, width), dtype=np.uint8)
+			np.bitwise_or.at(masks, (rows, index >> 3), (0x80 >> (index & 7)).astype(np.uint8))
+		return masks
@@ -2,20 +2,51 @@
 # GA Operator Base Class: selection, crossover, mutation
 #----------------------------------------------------------
 import numpy as np
-import copy
+
+# BASE
+class Operator:
+	_rng = None
+
+	@property
+	def rng(self):
+		'''np.random.Generator of the operator, which is injected by GA process'''
+		if self._rng is None:
+			self._rng = np.random.default_rng()
+		return self._rng
+
+	@rng.setter
+	def rng(self, rng):
+		self._rng = rng
+
+	def get_state(self):
+		'''state of the operator as a dict of arrays, e.g. for checkpoint. stateless by default'''
+		return {}
+
+	def set_state(self, state):
+		'''restore the operator from `get_state()`'''
+		pass
+
 
 # SELECTION
-class Selection:
+class Selection(Operator):
 	def select(self, population):
 		'''
 		- population: where the individuals from
 		- return: the selected individuals
 		'''
+		return np.array([I.copy() for I in population.individuals[self.select_index(population)]])
+
+	def select_index(self, population, size=None):
+		'''
+		- population: where the individuals from
+		- size      : count of the selected individuals, population.size by default
+		- return: positions of the selected individuals
+		'''
 		raise NotImplementedError
 
 
 # CROSSOVER
-class Crossover:
+class Crossover(Operator):
 	'''
 	this operation is only available for Individual class defined in self._individual_class
 	'''
@@ -45,18 +76,44 @@ class Crossover:
 		if not isinstance(self._rate, (list, tuple)):
 			return self._rate
 
-		fitness = [I.fitness for I in population.individuals]
-		fit_max, fit_avg = np.max(fitness), np.mean(fitness)
+		statistics = population.statistics
+		fit_max, fit_avg = statistics.fitness_max, statistics.fitness_mean
 		fit = max(individual_a.fitness, individual_b.fitness)
 		if fit_max-fit_avg:
 			return self._rate[1] if fit<fit_avg else self._rate[1] - (self._rate[1]-self._rate[0])*(fit-fit_avg)/(fit_max-fit_avg)
 		else:
 			return (self._rate[0]+self._rate[1])/2.0
 
+	def _adaptive_rates(self, fit, statistics):
+		'''
+		vectorized version of `_adaptive_rate`:
+			- fit       : the larger fitness of each pair of individuals
+			- statistics: PopulationStatistics of the population
+		'''
+		if not isinstance(self._rate, (list, tuple)):
+			return np.full(fit.shape, self._rate)
+
+		fit_max, fit_avg = statistics.fitness_max, statistics.fitness_mean
+		if fit_max-fit_avg:
+			return np.where(fit<fit_avg, self._rate[1], self._rate[1] - (self._rate[1]-self._rate[0])*(fit-fit_avg)/(fit_max-fit_avg))
+		else:
+			return np.full(fit.shape, (self._rate[0]+self._rate[1])/2.0)
+
 	@property
 	def individual_class(self):
 		return self._individual_class
 
+	@staticmethod
+	def cross_solutions(solution_a, solution_b, pos, alpha):
+		'''
+		generate two child solutions based on parent solutions:
+			- solution_a, solution_b: solutions of the selected individuals
+			- pos  : 0-1 vector to specify positions for crossing
+			- alpha: additional param
+			- return: two generated solutions
+		'''
+		raise NotImplementedError
+
 	@staticmethod
 	def cross_individuals(individual_a, individual_b, pos, alpha):
 		'''
@@ -68,55 +125,110 @@ class Crossover:
         '''
 		raise NotImplementedError
 
-	@staticmethod
-	def _cross_positions(dimension):
+	def _cross_positions(self, dimension):
 		'''generate a random and continuous range of positions for crossover'''
-		# start, end position
-		pos = np.random.choice(dimension, 2)
-		start, end = pos.min(), pos.max()
-		positions = np.zeros(dimension).astype(np.bool)
-		positions[start:end+1] = True
-		return positions
+		return self._cross_positions_matrix(1, dimension)[0]
+
+	def _cross_positions_matrix(self, num, dimension):
+		'''`_cross_positions` for `num` pairs at one time: one row of positions per pair'''
+		pos = self.rng.integers(dimension, size=(num, 2))
+		start, end = pos.min(axis=1), pos.max(axis=1)
+		index = np.arange(dimension)
+		return (index>=start[:,None]) & (index<=end[:,None])
 	
 	def cross(self, population):
 		'''
 		population: population to be crossed. population should be evaluated in advance 
 					since the crossover may be based on individual fitness.
 		'''
-		
-		random_population = np.random.permutation(population.individuals) # random order
-		new_individuals, count = [], 0
-		for individual_a, individual_b in zip(population.individuals, random_population):
+		# pair each of the first `num` individuals with a random one, so that 
+		# two children per pair are a bit more than the population size.
+		# random numbers of all pairs are drawn at one time
+		num = population.size//2 + 1
+		individuals = population.individuals
+		random_individuals = individuals[self.rng.permutation(population.size)[:num]]
+		probability = self.rng.random(num)
+		positions = self._cross_positions_matrix(num, population.individual.dimension)
+
+		new_individuals = []
+		for individual_a, individual_b, p, pos in zip(individuals[:num], random_individuals, probability, positions):
 			# crossover
-			if np.random.rand() <= self._adaptive_rate(individual_a, individual_b, population):
-				# random position to cross
-				pos = self._cross_positions(individual_a.dimension)
+			if p <= self._adaptive_rate(individual_a, individual_b, population):
 				child_individuals = self.cross_individuals(individual_a, individual_b, pos, self._alpha)
 				new_individuals.extend(child_individuals)
 
 			# skip crossover, but copy parents directly
 			else:
-				new_individuals.append(copy.deepcopy(individual_a))
-				new_individuals.append(copy.deepcopy(individual_b))
+				new_individuals.append(individual_a.copy())
+				new_individuals.append(individual_b.copy())
 
-			# generate two child at one crossover
-			count += 2
+		# select population.size children randomly
+		return self.rng.choice(new_individuals, population.size, replace=False)
 
-			# stop when reach the population size
-			if count > population.size:
-				break
+	def cross_population(self, population):
+		'''
+		crossover on the solutions matrix of an array-backed population.
+		return a tuple:
+			- solutions: solutions matrix of the children
+			- source   : parent position of each child, i.e. where the evaluation is from
+			- crossed  : True if the child is created by crossover rather than copied from parent
+		'''
+		# same count of children as `cross()`
+		num = population.size//2 + 1
+		pos_a = np.arange(num)
+		pos_b = self.rng.permutation(population.size)[:num]
+		children_a, children_b, crossed = self.cross_rows(population, pos_a, pos_b)
 
-		# the count of new individuals may lower than the population size
-		# since same parent individuals for crossover would be ignored
-		# so when count < size, param `replace` for choice() is True,
-		# which means dupilcated individuals are necessary
-		return np.random.choice(new_individuals, population.size, replace=False)
+		# select population.size children randomly
+		solutions = np.concatenate((children_a, children_b))
+		source = np.concatenate((pos_a, pos_b))
+		crossed = np.concatenate((crossed, crossed))
+		index = self.rng.choice(2*num, population.size, replace=False)
+		return solutions[index], source[index], crossed[index]
+
+	def cross_rows(self, population, pos_a, pos_b):
+		'''
+		cross pairs of parents at positions (pos_a[i], pos_b[i]) of an array-backed population,
+		each pair with the adaptive crossover rate. return a tuple:
+			- children_a, children_b: child solutions, copies of parents if not crossed
+			- crossed: True if the pair is crossed
+		'''
+		statistics = population.statistics
+		fitness = statistics.fitness
+		rates = self._adaptive_rates(np.maximum(fitness[pos_a], fitness[pos_b]), statistics)
+		crossed = self.rng.random(len(pos_a)) <= rates
+
+		children_a = population.solutions[pos_a]
+		children_b = population.solutions[pos_b]
+		if crossed.any():
+			children_a[crossed], children_b[crossed] = self.cross_matrix(children_a[crossed], children_b[crossed], self._alpha)
+		return children_a, children_b, crossed
+
+	def cross_matrix(self, solutions_a, solutions_b, alpha):
+		'''
+		cross each pair of rows in two solutions matrix:
+			- solutions_a, solutions_b: parent solutions, one solution per row
+			- alpha: additional param
+			- return: two matrix of child solutions
+		this default implementation crosses the pairs one by one, 
+		override it with a vectorized version if possible
+		'''
+		children_a, children_b = solutions_a.copy(), solutions_b.copy()
+		for i in range(solutions_a.shape[0]):
+			pos = self._cross_positions(solutions_a.shape[1])
+			children_a[i], children_b[i] = self.cross_solutions(solutions_a[i], solutions_b[i], pos, alpha)
+		return children_a, children_b
 
 # MUTATION
-class Mutation:
+class Mutation(Operator):
 	'''
 	this operation is only available for Individual class defined in self._individual_class
 	'''
+	# kind of move applied by the mutation, e.g. 'reverse' for reversing genes in continuous positions,
+	# so that the change of objective value could be calculated by a delta function incrementally.
+	# `move_params()` should be implemented and `mutate_solution()` should accept matrix in this case.
+	move = None
+
 	def __init__(self, rate):
 		self._rate = rate
 		self._individual_class = None
@@ -125,6 +237,14 @@ class Mutation:
 	def individual_class(self):
 		return self._individual_class	
 
+	@staticmethod
+	def move_params(positions):
+		'''
+		parameters of the move for each row of positions matrix, 
+		e.g. (start, end) for reversing genes
+		'''
+		raise NotImplementedError
+
 	@staticmethod
 	def mutate_individual(individual, positions, alpha):
 		'''
@@ -137,21 +257,103 @@ class Mutation:
 		raise NotImplementedError
 
 	@staticmethod
-	def _mutate_positions(dimension):
+	def mutate_solution(solution, ranges, positions, alpha):
+		'''
+		get mutated solution based on the selected solution:
+			- solution : solution of the selected individual
+			- ranges   : element ranges of solution
+			- positions: 0-1 vector to specify positions for crossing
+			- alpha: additional param
+			- return: the mutated solution
+		'''
+		raise NotImplementedError
+
+	def _mutate_positions(self, dimension):
 		'''select num positions from dimension to mutate'''
-		num = np.random.randint(dimension)+1
-		pos = np.random.choice(dimension, num, replace=False)
-		positions = np.zeros(dimension).astype(np.bool)
-		positions[pos] = True
+		return self._mutate_positions_matrix(1, dimension)[0]
+
+	def _mutate_positions_matrix(self, num, dimension):
+		'''`_mutate_positions` for `num` solutions at one time: one row of positions per solution'''
+		count = self.rng.integers(dimension, size=num)+1
+		
+		# the first `count` elements of a random permutation
+		order = np.argsort(self.rng.random((num, dimension)), axis=1)
+		positions = np.empty((num, dimension), dtype=bool)
+		np.put_along_axis(positions, order, np.arange(dimension)<count[:,None], axis=1)
 		return positions
 	
-	def mutate(self, population, alpha=None):
+	def mutate(self, population, alpha=None, delta=None):
 		'''
 		- population: population to be selected. 		
 		- alpha: additional params
+		- delta: optional function (solutions, move, params) -> change of objective values,
+		         to update evaluation incrementally if `move` is supported
 		'''
-		for individual in population.individuals:
-			if np.random.rand() > self._rate: continue
-			pos = self._mutate_positions(individual.dimension)
+		# random numbers of all individuals are drawn at one time
+		mutated = self.rng.random(population.size) <= self._rate
+		if not mutated.any(): return
+		positions = self._mutate_positions_matrix(int(mutated.sum()), population.individual.dimension)
+
+		for individual, pos in zip(population.individuals[mutated], positions):
+			# incremental evaluation
+			evaluation = None
+			if delta and self.move and individual.evaluation is not None:
+				evaluation = individual.evaluation + delta(individual.solution[None,:], self.move, self.move_params(pos[None,:]))[0]
+
 			individual.solution = self.mutate_individual(individual, pos, alpha)			
 			individual.init_evaluation() # reset evaluation
+			individual.evaluation = evaluation
+
+	def mutate_population(self, population, alpha=None, delta=None):
+		'''
+		mutate the solutions matrix of an array-backed population in place
+		- population: array-backed population to be mutated
+		- alpha: additional params
+		- delta: optional function (solutions, move, params) -> change of objective values
+		- return: (mutated, change)
+			- mutated: 0-1 vector, True if the individual is mutated
+			- change : change of objective values of the mutated individuals, None if delta is not supported
+		'''
+		mutated = self.rng.random(population.size) <= self._rate
+		change = None
+		if not mutated.any():
+			return mutated, change
+
+		solutions = population.solutions[mutated]
+		if delta and self.move:
+			pos = self._mutate_positions_matrix(*solutions.shape)
+			change = delta(solutions, self.move, self.move_params(pos))
+			population.solutions[mutated] = self.mutate_solution(solutions, population.ranges, pos, alpha)
+		else:
+			population.solutions[mutated] = self.mutate_matrix(solutions, population.ranges, alpha)
+		return mutated, change
+
+	def mutate_solutions(self, solutions, ranges, alpha=None):
+		'''
+		mutate each row of solutions matrix with the mutation rate
+		- solutions: one solution per row
+		- ranges   : element ranges of solution
+		- alpha: additional param
+		- return: (solutions, mutated), mutated solutions matrix and 0-1 vector, True if mutated
+		'''
+		mutated = self.rng.random(solutions.shape[0]) <= self._rate
+		solutions = solutions.copy()
+		if mutated.any():
+			solutions[mutated] = self.mutate_matrix(solutions[mutated], ranges, alpha)
+		return solutions, mutated
+
+	def mutate_matrix(self, solutions, ranges, alpha):
+		'''
+		get mutated solutions for each row of solutions matrix:
+			- solutions: the selected solutions, one solution per row
+			- ranges   : element ranges of solution
+			- alpha: additional param
+			- return: the mutated solutions matrix
+		this default implementation mutates the solutions one by one, 
+		override it with a vectorized version if possible
+		'''
+		mutated_solutions = solutions.copy()
+		for i in range(solutions.shape[0]):
+			pos = self._mutate_positions(solutions.shape[1])
+			mutated_solutions[i] = self.mutate_solution(solutions[i], ranges, pos, alpha)
+		return mutated_solutions
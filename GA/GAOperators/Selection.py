@@ -2,20 +2,42 @@
 # GA Operator: selection
 #----------------------------------------------------------
 import numpy as np
-import copy
 from .Operators import Selection
 
+
+def _sample_by_probability(probability, size, rng):
+	'''
+	positions sampled with replacement according to probability,
+	i.e. search random numbers in the cumulative probability
+	'''
+	cdf = np.cumsum(probability)
+	index = np.searchsorted(cdf, rng.random(size)*cdf[-1], side='right')
+	return np.minimum(index, len(cdf)-1) # avoid round-off error
+
+
+def _choice_without_replacement(n, size, k, rng):
+	'''
+	(size, k) matrix: each row has k different numbers sampled from range(n).
+	the j-th number is sampled from the rest n-j numbers, 
+	then shifted to skip the numbers sampled before
+	'''
+	res = np.empty((size, k), dtype=int)
+	for j in range(k):
+		r = rng.integers(n-j, size=size)
+		for chosen in np.sort(res[:, :j], axis=1).T:
+			r += r>=chosen
+		res[:, j] = r
+	return res
+
+
 class RouletteWheelSelection(Selection):
 	'''
 	select individuals by Roulette Wheel:
 	individuals are selected by a probability on its fitness
 	'''	
-	def select(self, population):
-		fitness = np.array([I.fitness for I in population.individuals])
-		selected_individuals = np.random.choice(population.individuals, population.size, p=fitness)
-
-		# pay attention to deep copy these objects		
-		return np.array([copy.deepcopy(I) for I in selected_individuals])
+	def select_index(self, population, size=None):
+		size = population.size if size is None else size
+		return _sample_by_probability(population.statistics.fitness, size, self.rng)
 
 
 class LinearRankingSelection(Selection):
@@ -33,15 +55,13 @@ class LinearRankingSelection(Selection):
 			
 		self.rate = rate
 
-	def select(self, population):
-		fitness = np.array([I.fitness for I in population.individuals])
-		pos = np.argsort(fitness)
+	def select_index(self, population, size=None):
+		size = population.size if size is None else size
+		pos = population.statistics.order
 		rank_fitness = 1.0 + (self.rate-1.0)/(population.size-1)*np.arange(population.size)
 		# normalize
 		rank_fitness = rank_fitness/(population.size*(1+self.rate)/2.0) # np.sum(rank_fitness) = population.size*(1+self.rate)/2
-		selected_individuals = np.random.choice(population.individuals[pos], population.size, p=rank_fitness)
-		
-		return np.array([copy.deepcopy(I) for I in selected_individuals])
+		return pos[_sample_by_probability(rank_fitness, size, self.rng)]
 
 
 class TournamentSelection(Selection):
@@ -50,22 +70,32 @@ class TournamentSelection(Selection):
 	'''
 	def __init__(self, k=2):
 		'''
-		rate: probability ratio of the best individual to the worst
-			it shows the relative probability of the best/worst individual to be selected
+		k: count of candidates in each tournament
 		'''
-		if not isinstance(k, int) and k<2:
+		if not isinstance(k, int) or k<2:
 			raise ValueError('the candinates number should be integer larger than 1') 
 			
 		self.k = k
 
-	def select(self, population):
-		fitness = np.array([I.fitness for I in population.individuals])
-		count = 0
-		selected_individuals = []
-		while count < population.size:
-			count += 1
-			candidates = np.random.choice(population.individuals, self.k, replace=False)
-			winner = max(candidates, key=lambda I: I.fitness)
-			selected_individuals.append(winner)
+	def select_index(self, population, size=None):
+		size = population.size if size is None else size
+		# all tournaments at one time: one row of candidates per tournament
+		candidates = _choice_without_replacement(population.size, size, self.k, self.rng)
+		winner = np.argmax(population.statistics.fitness[candidates], axis=1)
+		return candidates[np.arange(size), winner]
+
+
+class StochasticUniversalSampling(Selection):
+	'''
+	select individuals by Stochastic Universal Sampling:
+	like Roulette Wheel, but with evenly spaced pointers from one random start,
+	so the count of each selected individual is close to its expectation
+	'''
+	def select_index(self, population, size=None):
+		size = population.size if size is None else size
+		cdf = np.cumsum(population.statistics.fitness)
+		pointers = (self.rng.random() + np.arange(size)) * (cdf[-1]/size)
+		index = np.minimum(np.searchsorted(cdf, pointers, side='right'), population.size-1)
 
-		return np.array([copy.deepcopy(I) for I in selected_individuals])
+		# random order, since the pointers are sorted
+		return self.rng.permutation(index)
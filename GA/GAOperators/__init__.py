@@ -1,3 +1,4 @@
 from . import Selection
 from . import Crossover
 from . import Mutation
+from . import LocalSearch
@@ -0,0 +1,173 @@
+#----------------------------------------------------------
+# Array-backed Population class
+#----------------------------------------------------------
+import numpy as np
+from .Population import Population
+from .Statistics import PopulationStatistics
+
+
+class ArrayPopulation(Population):
+	'''
+	structure-of-arrays population: solutions of all individuals are stored
+	in one (size, dimension) matrix, while evaluation, fitness and the mask of
+	individuals to be evaluated are stored in parallel vectors
+	'''
+	def __init__(self, individual, size=50, evaluator=None):
+		'''
+		individual   : individual template
+		size         : count of individuals
+		evaluator    : Evaluator calling objective function, e.g. in parallel
+		'''
+		super().__init__(individual, size, evaluator)
+		self.solutions = None   # (size, dimension) matrix
+		self._evaluation = None # objective values
+		self._fitness = None    # normalized fitness
+		self.pending = None     # True if the individual needs evaluation
+
+	@property
+	def evaluation(self):
+		return self._evaluation
+
+	@evaluation.setter
+	def evaluation(self, evaluation):
+		self._evaluation = evaluation
+		self.invalidate_statistics()
+
+	@property
+	def fitness(self):
+		return self._fitness
+
+	@fitness.setter
+	def fitness(self, fitness):
+		self._fitness = fitness
+		self.invalidate_statistics()
+
+	@property
+	def ranges(self):
+		return self.individual.ranges
+
+	@property
+	def dimension(self):
+		return self.individual.dimension
+
+	def initialize(self):
+		'''initialization for next generation'''
+		IndvClass = self.individual.__class__
+		self.solutions = IndvClass.init_solutions(self.individual.ranges, self.size, self.rng)
+		if self.individual.dtype is not None:
+			self.solutions = self.solutions.astype(self.individual.dtype, copy=False)
+		self.evaluation = np.full(self.size, np.nan)
+		self.fitness = np.zeros(self.size)
+		self.pending = np.ones(self.size, dtype=bool)
+
+	@property
+	def best_index(self):
+		'''position of the best individual according to evaluation value'''
+		return self.statistics.best_index
+
+	@property
+	def best(self):
+		'''get best individual, which is created from the best row of solutions'''
+		pos = self.best_index
+		individual = self.individual.from_solution(self.solutions[pos].copy())
+		individual.evaluation = self.evaluation[pos]
+		individual.fitness = self.fitness[pos]
+		return individual
+
+	def get_solution(self, pos):
+		'''solution of the individual at position `pos`, a view of the solutions matrix'''
+		return self.solutions[pos]
+
+	def evaluate(self, fun_evaluation, fun_fitness):
+		'''
+		calculate objectibe value and fitness for each individual.
+			- fun_evaluation: objective function
+			- fun_fitness  	: population fitness based on evaluation
+		'''
+		# calculate the pending individuals only
+		if self.pending.any():
+			solutions, self.evaluation[self.pending] = self.evaluator.evaluate(fun_evaluation, self.solutions[self.pending])
+			if self.evaluator.local_search:
+				self.solutions[self.pending] = self.individual.normalize_solutions(solutions)
+			self.pending[:] = False
+
+		# calculate fitness
+		fitness = fun_fitness(self.evaluation)
+		self.fitness = fitness/fitness.sum() # normalize
+		self._statistics = PopulationStatistics(self.evaluation, self.fitness)
+
+	def take(self, index):
+		'''rearrange individuals according to index, e.g. positions of the selected individuals'''
+		self.solutions = self.solutions[index]
+		self.evaluation = self.evaluation[index]
+		self.fitness = self.fitness[index]
+		self.pending = self.pending[index]
+
+	def elite(self):
+		'''copy of the best individual: (solution, evaluation, fitness)'''
+		pos = self.best_index
+		return self.solutions[pos].copy(), self.evaluation[pos], self.fitness[pos]
+
+	def replace(self, pos, elite):
+		'''put the elite individual back at position `pos`'''
+		self.solutions[pos], self.evaluation[pos], self.fitness[pos] = elite
+		self.pending[pos] = False
+		self.invalidate_statistics()
+
+	def select(self, selection):
+		'''selection operation on solutions matrix'''
+		self.take(selection.select_index(self))
+
+	def cross(self, crossover):
+		'''crossover operation on solutions matrix'''
+		solutions, source, crossed = crossover.cross_population(self)
+		if crossed.any():
+			solutions[crossed] = self.individual.normalize_solutions(solutions[crossed])
+
+		# children copied from parents directly keep the evaluation
+		self.solutions = solutions
+		self.evaluation = self.evaluation[source]
+		self.fitness = self.fitness[source]
+		self.pending = self.pending[source] | crossed
+		self.evaluation[crossed] = np.nan
+
+	def mutate(self, mutation, rate):
+		'''mutation operation on solutions matrix'''
+		mutated, change = mutation.mutate_population(self, rate, self.evaluator.delta)
+		if not mutated.any():
+			return
+		self.invalidate_statistics()
+		self.solutions[mutated] = self.individual.normalize_solutions(self.solutions[mutated])
+
+		# update evaluation incrementally for the evaluated individuals
+		if change is None:
+			self.pending |= mutated
+		else:
+			index = np.where(mutated)[0]
+			self.evaluation[index] += change
+			self.pending[index] |= np.isnan(self.evaluation[index])
+
+	def emigrants(self, num):
+		'''copies of the best `num` evaluated individuals: (solutions matrix, evaluation vector)'''
+		index = np.argsort(self.evaluation, kind='stable')[:num]
+		return self.solutions[index], self.evaluation[index]
+
+	def immigrate(self, solutions, evaluation):
+		'''replace the worst individuals with evaluated solutions, e.g. migrants from other populations'''
+		index = np.argsort(self.evaluation, kind='stable')[::-1][:len(solutions)]
+		self.solutions[index] = self.individual.normalize_solutions(solutions[:len(index)])
+		self.evaluation[index] = evaluation[:len(index)]
+		self.pending[index] = False
+		self.invalidate_statistics()
+
+	def get_state(self):
+		'''state of individuals as arrays'''
+		return {'solutions': self.solutions, 'evaluation': self.evaluation, 'fitness': self.fitness, 'pending': self.pending}
+
+	def set_state(self, state):
+		'''restore individuals from `get_state()`'''
+		self.solutions = state['solutions'].copy()
+		self.evaluation = state['evaluation'].copy()
+		self.fitness = state['fitness'].copy()
+		self.pending = state['pending'].copy()
+		self.size = self.solutions.shape[0]
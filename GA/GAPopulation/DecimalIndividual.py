@@ -10,13 +10,14 @@ class DecimalFloatIndividual(Individual):
 	dicimal encoded individual, the solutions are float elements
 	ranges: element range of solution, e.g. [(lb1, ub1), (lb2, ub2), ...]
 	'''
+	__slots__ = ()
 	
 	def init_solution(self, ranges):
 		'''
 		initialize random solution in `ranges`
 		ranges: element range of solution, e.g. [(lb1, ub1), (lb2, ub2), ...]
 		'''		
-		self._ranges = np.array(ranges)
+		self._ranges = np.asarray(ranges) # shared with the template if it is an array already
 		self._dimension = self._ranges.shape[0]
 
 		# initialize solution within [lb, ub]
@@ -25,6 +26,19 @@ class DecimalFloatIndividual(Individual):
 		ub = self._ranges[:, 1]
 		self._solution = lb + (ub-lb)*seeds
 
+	@classmethod
+	def init_solutions(cls, ranges, size, rng=None):
+		'''
+		initialize `size` random solutions in `ranges`, one solution per row
+		- rng: np.random.Generator, a new one by default
+		'''
+		rng = np.random.default_rng(rng)
+		ranges = np.array(ranges)
+		seeds = rng.random((size, ranges.shape[0]))
+		lb = ranges[:, 0]
+		ub = ranges[:, 1]
+		return lb + (ub-lb)*seeds
+
 
 
 class DecimalIntegerIndividual(Individual):
@@ -32,13 +46,14 @@ class DecimalIntegerIndividual(Individual):
 	dicimal encoded individual, the solutions are integer elements
 	ranges: element range of solution, e.g. [(lb1, ub1), (lb2, ub2), ...]
 	'''
+	__slots__ = ()
 
 	def init_solution(self, ranges):
 		'''
 		initialize random integer solution in `ranges`
 		ranges: element range of solution, e.g. [(lb1, ub1), (lb2, ub2), ...]
 		'''		
-		self._ranges = np.array(ranges)
+		self._ranges = np.asarray(ranges) # shared with the template if it is an array already
 		self._dimension = self._ranges.shape[0]
 
 		# initialize solution within [lb, ub]
@@ -47,6 +62,16 @@ class DecimalIntegerIndividual(Individual):
 		ub = self._ranges[:, 1]
 		self._solution = np.rint(lb + (ub-lb)*seeds)
 
+	@classmethod
+	def init_solutions(cls, ranges, size, rng=None):
+		'''
+		initialize `size` random integer solutions in `ranges`, one solution per row
+		'''
+		return np.rint(DecimalFloatIndividual.init_solutions(ranges, size, rng))
+
+	@staticmethod
+	def normalize_solutions(solutions):
+		return np.rint(solutions)
 
 	@property
 	def solution(self):
@@ -54,4 +79,4 @@ class DecimalIntegerIndividual(Individual):
 
 	@solution.setter
 	def solution(self, solution):
-		self._solution = np.rint(solution)
+		self._solution = self._cast(np.rint(solution))
@@ -4,21 +4,35 @@
 # 	- _ranges
 # 	- _dimension
 # 	- _solution
+# 	- _dtype
 # 	- evaluation
 # 	- fitness
 # - methods to be implemented
 # 	- init_solution(ranges): initialize random solution
 #   - solution
+# - class methods for array-backed population
+# 	- init_solutions(ranges, size, rng): initialize random solutions matrix
+# 	- normalize_solutions(solutions): same conversion as solution setter
 #----------------------------------------------------------
+import numpy as np
 
 class Individual:
-	'''base class: individual of population'''
-	def __init__(self, ranges):
+	'''
+	base class: individual of population. attributes are stored in `__slots__` rather than
+	an instance dict, so derived classes should define `__slots__` as well to keep it compact
+	'''
+	__slots__ = ('_ranges', '_dimension', '_solution', '_dtype', 'evaluation', 'fitness')
+
+	def __init__(self, ranges, dtype=None):
 		'''
 		ranges: element ranges of solution
+		dtype : optional data type of solution, e.g. np.float32 genes or np.int16 sequences
 		'''
 		# random solution
+		self._dtype = np.dtype(dtype) if dtype else None
 		self.init_solution(ranges)
+		if self._dtype is not None:
+			self._solution = self._cast(self._solution)
 
 		# evaluation and fitness
 		self.init_evaluation()
@@ -38,10 +52,47 @@ class Individual:
 		self.evaluation = None
 		self.fitness = None
 
+	def from_solution(self, solution):
+		'''
+		new individual of the same class, sharing ranges and dtype with this one, which adopts
+		`solution` through the solution setter without random initialization, e.g. a child solution
+		'''
+		individual = self._new()
+		individual.solution = solution
+		individual.evaluation = None
+		individual.fitness = None
+		return individual
+
+	def copy(self):
+		'''
+		copy-on-write copy of the individual: solution buffer and ranges are shared rather than copied.
+		the shared solution buffer becomes read-only, so assign a new solution rather than modify it in place.
+		'''
+		if isinstance(self._solution, np.ndarray):
+			self._solution.flags.writeable = False
+		individual = self._new()
+		individual._solution = self._solution
+		individual.evaluation = self.evaluation
+		individual.fitness = self.fitness
+		return individual
+
+	def _new(self):
+		'''instance of the same class sharing ranges and dtype, without calling `__init__`'''
+		individual = self.__class__.__new__(self.__class__)
+		individual._ranges, individual._dimension, individual._dtype = self._ranges, self._dimension, self._dtype
+		if hasattr(self, '__dict__'): # attributes of derived classes without `__slots__`
+			individual.__dict__.update(self.__dict__)
+		return individual
+
 	@property
 	def ranges(self):
 		return self._ranges
 
+	@property
+	def dtype(self):
+		'''data type of solution, None if not specified'''
+		return self._dtype
+
 	@property
 	def dimension(self):
 		return self._dimension
@@ -52,5 +103,25 @@ class Individual:
 
 	@solution.setter
 	def solution(self, solution):
-		self._solution = solution
-	
+		self._solution = self._cast(solution)
+
+	def _cast(self, solution):
+		'''solution converted to the specified dtype, the buffer is adopted if the dtype matches'''
+		return solution if self._dtype is None else np.asarray(solution, dtype=self._dtype)
+
+	@classmethod
+	def init_solutions(cls, ranges, size, rng=None):
+		'''
+		initialize `size` random solutions stored as rows of a matrix, drawn from 
+		np.random.Generator `rng`. this default implementation creates Individuals one by one
+		with the global random state, override it with a vectorized version if possible
+		'''
+		return np.array([cls(ranges).solution for i in range(size)])
+
+	@staticmethod
+	def normalize_solutions(solutions):
+		'''
+		convert each row of solutions matrix as the solution setter does,
+		e.g. rounding to integers. nothing to do by default
+		'''
+		return solutions
@@ -2,34 +2,71 @@
 # Population class
 #----------------------------------------------------------
 import numpy as np
+from GA.GAEvaluation.Evaluator import Evaluator
+from .Statistics import PopulationStatistics
 
 
 class Population:
 	'''collection of individuals'''
-	def __init__(self, individual, size=50):
+	def __init__(self, individual, size=50, evaluator=None):
 		'''
 		individual   : individual template
 		size         : count of individuals		
+		evaluator    : Evaluator calling objective function, e.g. in parallel
 		'''
 		self.individual = individual
 		self.size = size
-		self.individuals = None
+		self._individuals = None
+		self._statistics = None
+		self.evaluator = evaluator if evaluator else Evaluator()
+		self.rng = np.random.default_rng() # np.random.Generator, injected by GA process
 
+	@property
+	def individuals(self):
+		return self._individuals
+
+	@individuals.setter
+	def individuals(self, individuals):
+		self._individuals = individuals
+		self.invalidate_statistics()
+
+	@property
+	def statistics(self):
+		'''PopulationStatistics of current individuals, which is cached until they change'''
+		if self._statistics is None:
+			self._statistics = PopulationStatistics(self.evaluation, self.fitness)
+		return self._statistics
+
+	def invalidate_statistics(self):
+		'''drop the cached statistics, called when individuals change in place'''
+		self._statistics = None
 
 	def initialize(self):
 		'''initialization for next generation'''
 		IndvClass = self.individual.__class__
-		self.individuals = np.array([IndvClass(self.individual.ranges) for i in range(self.size)], dtype=IndvClass)
+		solutions = IndvClass.init_solutions(self.individual.ranges, self.size, self.rng)
+		if self.individual.dtype is not None:
+			solutions = solutions.astype(self.individual.dtype, copy=False)
+		self.individuals = np.array([self.individual.from_solution(solution) for solution in solutions], dtype=IndvClass)
+
+	@property
+	def evaluation(self):
+		'''objective values of all individuals, nan if not evaluated'''
+		return np.array([I.evaluation for I in self.individuals], dtype=float)
+
+	@property
+	def fitness(self):
+		'''fitness of all individuals, nan if not evaluated'''
+		return np.array([I.fitness for I in self.individuals], dtype=float)
 
 	@property
 	def best(self):
 		'''get best individual according to evaluation value'''
-		# collect evaluations
-		evaluation = np.array([I.evaluation for I in self.individuals])
+		return self.individuals[self.statistics.best_index]
 
-		# get the minimum position
-		pos = np.argmin(evaluation)
-		return self.individuals[pos]
+	def get_solution(self, pos):
+		'''solution of the individual at position `pos`'''
+		return self.individuals[pos].solution
 
 	def evaluate(self, fun_evaluation, fun_fitness):
 		'''
@@ -38,8 +75,15 @@ class Population:
 			- fun_fitness  	: population fitness based on evaluation
 		'''
 
-		# get the value directly if it has been calculated before
-		evaluation = np.array([fun_evaluation(I.solution) if I.evaluation is None else I.evaluation for I in self.individuals])		
+		# calculate the individuals without evaluation only
+		pending = [I for I in self.individuals if I.evaluation is None]
+		if pending:
+			solutions, values = self.evaluator.evaluate(fun_evaluation, np.array([I.solution for I in pending]))
+			for I, s, e in zip(pending, solutions, values):
+				if self.evaluator.local_search: I.solution = s
+				I.evaluation = e
+
+		evaluation = np.array([I.evaluation for I in self.individuals])
 
 		# calculate fitness
 		fitness = fun_fitness(evaluation)
@@ -48,4 +92,62 @@ class Population:
 		# set attributes for each individual
 		for I, e, f in zip(self.individuals, evaluation, fitness):
 			I.evaluation = e
-			I.fitness = f
\ No newline at end of file
+			I.fitness = f
+		self._statistics = PopulationStatistics(evaluation, fitness)
+
+	def elite(self):
+		'''copy of the best individual, which is kept from the GA operations'''
+		return self.best.copy()
+
+	def replace(self, pos, elite):
+		'''put the elite individual back at position `pos`'''
+		self.individuals[pos] = elite
+		self.invalidate_statistics()
+
+	def select(self, selection):
+		'''selection operation on current individuals'''
+		self.individuals = selection.select(self)
+
+	def cross(self, crossover):
+		'''crossover operation on current individuals'''
+		self.individuals = crossover.cross(self)
+
+	def mutate(self, mutation, rate):
+		'''mutation operation on current individuals'''
+		mutation.mutate(self, rate, self.evaluator.delta)
+		self.invalidate_statistics()
+
+	def emigrants(self, num):
+		'''copies of the best `num` evaluated individuals: (solutions matrix, evaluation vector)'''
+		index = np.argsort(self.evaluation, kind='stable')[:num]
+		return np.array([self.individuals[i].solution for i in index]), self.evaluation[index]
+
+	def immigrate(self, solutions, evaluation):
+		'''replace the worst individuals with evaluated solutions, e.g. migrants from other populations'''
+		index = np.argsort(self.evaluation, kind='stable')[::-1][:len(solutions)]
+		for i, solution, value in zip(index, solutions, evaluation):
+			I = self.individual.from_solution(solution.copy())
+			I.evaluation = value
+			self.individuals[i] = I
+		self.invalidate_statistics()
+
+	def get_state(self):
+		'''state of individuals as arrays: solutions matrix, evaluation and fitness vectors with nan if not evaluated'''
+		to_float = lambda values: np.array([np.nan if v is None else v for v in values], dtype=float)
+		return {
+			'solutions' : np.array([I.solution for I in self.individuals]),
+			'evaluation': to_float([I.evaluation for I in self.individuals]),
+			'fitness'   : to_float([I.fitness for I in self.individuals])
+		}
+
+	def set_state(self, state):
+		'''restore individuals from `get_state()`'''
+		IndvClass = self.individual.__class__
+		to_value = lambda v: None if np.isnan(v) else v
+		individuals = []
+		for solution, evaluation, fitness in zip(state['solutions'], state['evaluation'], state['fitness']):
+			I = self.individual.from_solution(solution.copy())
+			I.evaluation, I.fitness = to_value(evaluation), to_value(fitness)
+			individuals.append(I)
+		self.individuals = np.array(individuals, dtype=IndvClass)
+		self.size = len(individuals)
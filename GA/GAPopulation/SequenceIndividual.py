@@ -10,6 +10,7 @@ class UniqueSeqIndividual(Individual):
 	sequence encoded individual: unique numbers in a certain order
 	- ranges: int, e.g. ranges=5 -> 0,1,2,3,4
 	'''
+	__slots__ = ()
 	
 	def init_solution(self, ranges):
 		'''
@@ -22,12 +23,24 @@ class UniqueSeqIndividual(Individual):
 		self._dimension = ranges
 		self._solution = np.random.choice(ranges, ranges, replace=False)
 
+	@classmethod
+	def init_solutions(cls, ranges, size, rng=None):
+		'''
+		initialize `size` random sequences, one sequence per row
+		- rng: np.random.Generator, a new one by default
+		'''
+		if not isinstance(ranges, int) or ranges<=1:
+			raise ValueError('the sequence range should be larger than 1')
+		rng = np.random.default_rng(rng)
+		return np.argsort(rng.random((size, ranges)), axis=1).astype(np.int32)
+
 
 class UniqueLoopIndividual(Individual):
 	'''
 	sequence encoded individual: unique numbers in a certain loop
 	- ranges: int, e.g. ranges=5 -> 0,1,2,3,4 = 1,2,3,4,0 = 3,4,0,1,2 = ...
 	'''
+	__slots__ = ()
 	
 	def init_solution(self, ranges):
 		'''
@@ -47,9 +60,33 @@ class UniqueLoopIndividual(Individual):
 
 	@solution.setter
 	def solution(self, solution):
-		self._solution = self._unique_sequence(solution)
+		self._solution = self._cast(self._unique_sequence(solution))
 
-	def _unique_sequence(self, sequence):
+	@classmethod
+	def init_solutions(cls, ranges, size, rng=None):
+		'''
+		initialize `size` random loops, one loop per row
+		'''
+		return cls.normalize_solutions(UniqueSeqIndividual.init_solutions(ranges, size, rng))
+
+	@staticmethod
+	def normalize_solutions(solutions):
+		'''represent each loop in rows of solutions matrix from element 0, at one time'''
+		num, dimension = solutions.shape
+
+		# rotate each row to start from element 0
+		start = np.argmax(solutions==0, axis=1)[:,None]
+		index = (np.arange(dimension)[None,:]+start) % dimension
+		unique_seq = np.take_along_axis(solutions, index, axis=1)
+
+		# deal with clockwise and anticlockwise loop
+		reverse = unique_seq[:,1] > unique_seq[:,-1]
+		unique_seq[reverse, 1:] = unique_seq[reverse, :0:-1]
+
+		return unique_seq
+
+	@staticmethod
+	def _unique_sequence(sequence):
 		'''
 		only relative order is considered for a sequece loop, 
 		so represent the loop from element 0
@@ -67,8 +104,9 @@ class UniqueLoopIndividual(Individual):
 			unique_seq = np.concatenate((sequence[pos:],sequence[0:pos]))
 
 		# deal with clockwise and anticlockwise loop
+		# create a new sequence since the input may be shared by other individuals
 		if unique_seq[1] > unique_seq[-1]:
-			unique_seq[1:] = unique_seq[-1:0:-1]
+			unique_seq = np.concatenate((unique_seq[:1], unique_seq[:0:-1]))
 		
 		return unique_seq
 
@@ -78,6 +116,7 @@ class ZeroOneSeqIndividual(Individual):
 	sequence encoded individual: 0-1 sequence
 	ranges: int, length of 0-1 sequence
 	'''
+	__slots__ = ()
 
 	def init_solution(self, ranges):
 		'''
@@ -89,3 +128,79 @@ class ZeroOneSeqIndividual(Individual):
 		self._ranges = ranges
 		self._dimension = ranges
 		self._solution = np.random.choice(2, ranges)
+
+	@classmethod
+	def init_solutions(cls, ranges, size, rng=None):
+		'''
+		initialize `size` random 0-1 sequences, one sequence per row
+		- rng: np.random.Generator, a new one by default
+		'''
+		if not isinstance(ranges, int) or ranges<=1:
+			raise ValueError('the sequence range should be larger 1')
+		rng = np.random.default_rng(rng)
+		return rng.integers(2, size=(size, ranges))
+
+
+class PackedZeroOneSeqIndividual(ZeroOneSeqIndividual):
+	'''
+	sequence encoded individual: 0-1 sequence packed into bytes, i.e. 8 genes per uint8 element
+	in the order of `np.packbits`, and the unused bits of the last byte are always 0
+	ranges: int, length of 0-1 sequence
+	dtype is always uint8
+	'''
+	__slots__ = ()
+
+	def __init__(self, ranges, dtype=None):
+		super().__init__(ranges) # packed bits are always uint8
+
+	def init_solution(self, ranges):
+		'''
+		initialize random 0-1 sequence: e.g. 1,0,1,1,0 -> [0b10110000]
+		'''	
+		if not isinstance(ranges, int) or ranges<=1:
+			raise ValueError('the sequence range should be larger 1')
+
+		self._ranges = ranges
+		self._dimension = ranges
+		self._solution = np.packbits(np.random.choice(2, ranges))
+
+	@property
+	def solution(self):
+		return self._solution
+
+	@solution.setter
+	def solution(self, solution):
+		'''packed solution, or 0-1 sequence to be packed'''
+		solution = np.asarray(solution)
+		self._solution = self.pack_solutions(solution) if solution.shape[-1]==self._ranges else solution
+
+	@property
+	def bits(self):
+		'''unpacked 0-1 sequence'''
+		return self.unpack_solutions(self._solution, self._ranges)
+
+	@classmethod
+	def init_solutions(cls, ranges, size, rng=None):
+		'''
+		initialize `size` random packed 0-1 sequences, one sequence per row
+		- rng: np.random.Generator, a new one by default
+		'''
+		if not isinstance(ranges, int) or ranges<=1:
+			raise ValueError('the sequence range should be larger 1')
+		rng = np.random.default_rng(rng)
+		solutions = rng.integers(256, size=(size, (ranges+7)//8), dtype=np.uint8)
+		solutions[:,-1] &= np.uint8((0xFF00 >> (ranges%8 or 8)) & 0xFF) # clear unused bits
+		return solutions
+
+	@staticmethod
+	def pack_solutions(solutions):
+		'''pack 0-1 sequences along the last axis'''
+		return np.packbits(solutions, axis=-1)
+
+	@staticmethod
+	def unpack_solutions(solutions, ranges, axis=-1):
+		'''
+		unpack solutions along `axis` to 0-1 sequences of length `ranges`, e.g. axis=0 in
+		a batch objective function, which accepts solutions as columns of a matrix
+		'''
+		return np.unpackbits(solutions, axis=axis, count=ranges)
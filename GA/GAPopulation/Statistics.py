@@ -0,0 +1,34 @@
+#----------------------------------------------------------
+# Statistics of population shared by GA operators
+#----------------------------------------------------------
+import numpy as np
+
+
+class PopulationStatistics:
+	'''
+	statistics of evaluation and fitness of a population, which are computed once
+	and cached by the population until individuals change:
+		- evaluation, fitness: vectors of all individuals, nan if not evaluated
+		- best_index, best   : position and evaluation of the best individual
+		- mean               : mean evaluation
+		- fitness_max, fitness_mean, fitness_min
+		- order              : positions sorted by fitness, from the worst to the best
+	'''
+	def __init__(self, evaluation, fitness):
+		self.evaluation = np.asarray(evaluation, dtype=float)
+		self.fitness = np.asarray(fitness, dtype=float)
+
+		self.best_index = int(np.argmin(self.evaluation))
+		self.best = self.evaluation[self.best_index]
+		self.mean = self.evaluation.mean()
+
+		self.fitness_max = self.fitness.max()
+		self.fitness_mean = self.fitness.mean()
+		self.fitness_min = self.fitness.min()
+		self._order = None
+
+	@property
+	def order(self):
+		if self._order is None:
+			self._order = np.argsort(self.fitness)
+		return self._order
@@ -1,3 +1,5 @@
 from . import Individual
+from . import Statistics
 from . import Population
 from . import DecimalIndividual
+from . import ArrayPopulation
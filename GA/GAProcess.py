@@ -1,15 +1,27 @@
 #----------------------------------------------------------
 # Simple Genetic Algorithm
 #----------------------------------------------------------
+import time
 import numpy as np
-import copy
+from .GACheckpoint import get_random_state, set_random_state
+
+
+def default_fitness(evaluation):
+	'''
+	default fitness to minimize the objective; a module function so that GA is picklable.
+	inf evaluation, e.g. the penalty of timed out solutions, gets zero fitness.
+	'''
+	fitness = np.arctan(-evaluation) + np.pi
+	return np.where(np.isposinf(evaluation), 0.0, fitness)
 
 
 class GA():
 	'''Simple Genetic Algorithm'''
-	def __init__(self, population, selection, crossover, mutation, fun_fitness=None):
+	def __init__(self, population, selection, crossover, mutation, fun_fitness=None, monitor=None, rng=None):
 		'''
 		fun_fitness: fitness based on objective values. minimize the objective by default
+		monitor    : optional Monitor collecting statistics of each generation
+		rng        : np.random.Generator, seed or SeedSequence of the random numbers, see `rng`
 		'''		
 		# check compatibility between Individual and GA operators
 		if not crossover.individual_class or not population.individual.__class__ in crossover.individual_class:
@@ -21,41 +33,213 @@ class GA():
 		self.selection = selection
 		self.crossover = crossover
 		self.mutation = mutation
-		self.fun_fitness = fun_fitness if fun_fitness else (lambda x:np.arctan(-x)+np.pi)
+		self.fun_fitness = fun_fitness if fun_fitness else default_fitness
+		self.monitor = monitor
+		self.generation = 0 # count of generations evolved in the last run
+		self.history = None # records of generations if required by `iterate()`
+		self.rng = rng
+
+	@property
+	def rng(self):
+		return self._rng
+
+	@rng.setter
+	def rng(self, rng):
+		'''
+		np.random.Generator shared by population, evaluator and operators, created from `rng`
+		if it is a seed or SeedSequence. when `rng` is None, the seed is drawn from the global
+		random state, so that `np.random.seed()` still makes the process reproducible
+		'''
+		if rng is None:
+			rng = np.random.randint(2**32, dtype=np.uint64)
+		self._rng = np.random.default_rng(rng)
+		for component in (self.population, self.population.evaluator, self.selection, self.crossover, self.mutation):
+			component.rng = self._rng
 
-	def run(self, fun_evaluation, gen=50):
+	def run(self, fun_evaluation, gen=50, checkpoint=None, termination=None):
 		'''
 		solve the problem based on Simple GA process
 		two improved methods could be considered:
 			a) elitism mechanism: keep the best individual, i.e. skip the selection, crossover, mutation operations
 			b) adaptive mechenism: adaptive crossover rate, adaptive mutation megnitude. 
+		- checkpoint : optional Checkpoint to save the process periodically
+		- termination: optional Termination to stop before `gen` generations
 		'''
 
-		# initialize population
-		self.population.initialize()
+		try:
+			# initialize population
+			self.population.initialize()
 
-		# solving process
-		for n in range(1, gen+1):
+			# solving process
+			return self._run(fun_evaluation, 1, gen, checkpoint, termination)
+		finally:
+			# release resources of evaluator, e.g. process pool
+			self.population.evaluator.close()
 
-			# evaluate and get the best individual in previous generation
-			self.population.evaluate(fun_evaluation, self.fun_fitness)
-			the_best = copy.deepcopy(self.population.best)
-
-			# selection
-			self.population.individuals = self.selection.select(self.population)
+	def iterate(self, fun_evaluation, gen=50, checkpoint=None, termination=None, history=False):
+		'''
+		generator form of `run()`, yielding a record at the end of each generation:
+			- generation : current generation
+			- best       : best evaluation of the evaluated population
+			- solution   : read-only view of the best solution, copy it to keep
+			- mean, std  : statistics of evaluation
+			- evaluations: count of objective function calls
+			- time       : seconds of this generation
+			- elapsed    : seconds since started
+		the process stops when the loop is broken, e.g.
+			for record in g.iterate(f, 500):
+				if record['best']<1e-6: break
+		- history: keep copies of records in `self.history` or not
+		'''
+		self.history = [] if history else None
+		try:
+			# initialize population
+			self.population.initialize()
 
-			# crossover
-			self.population.individuals = self.crossover.cross(self.population)
+			# solving process
+			for record in self._generations(fun_evaluation, 1, gen, checkpoint, termination, records=True):
+				if history: self.history.append(dict(record, solution=record['solution'].copy()))
+				yield record
+		finally:
+			# release resources of evaluator, e.g. process pool
+			self.population.evaluator.close()
 
-			# mutation
-			rate = 1.0 - np.random.rand()**((1.0-n/gen)**3)
-			self.mutation.mutate(self.population, rate)
+	def resume(self, fun_evaluation, checkpoint, termination=None):
+		'''
+		continue the process saved in checkpoint file, with the same objective function and operators.
+		checkpoint is kept saving periodically.
+		'''
+		try:
+			state = checkpoint.load()
+			n, gen = int(state['generation']), int(state['gen'])
+			self.set_state(state)
+			return self._run(fun_evaluation, n+1, gen, checkpoint, termination)
+		finally:
+			self.population.evaluator.close()
 
-			# elitism mechanism: 
-			# set a random individual as the best in previous generation
-			pos = np.random.randint(self.population.size)
-			self.population.individuals[pos] = the_best
+	def _run(self, fun_evaluation, start, gen, checkpoint, termination):
+		'''evolve from generation `start` to `gen`, and return the best individual'''
+		for record in self._generations(fun_evaluation, start, gen, checkpoint, termination):
+			pass
 
 		# return the best individual
 		self.population.evaluate(fun_evaluation, self.fun_fitness)
 		return self.population.best
+
+	def _generations(self, fun_evaluation, start, gen, checkpoint, termination, records=False):
+		'''evolve from generation `start` to `gen`, yield record of each generation if `records`, otherwise None'''
+		if self.monitor: self.monitor.begin(self)
+		if termination: termination.start(self.population.evaluator)
+		started = time.perf_counter()
+		try:
+			for n in range(start, gen+1):
+				generation_started = time.perf_counter()
+				# check termination criteria with the evaluated population
+				progress = None
+				if termination:
+					self._evaluate(fun_evaluation)
+					if termination.done(n, self.population.statistics.best):
+						break
+					progress = termination.progress(n, gen)
+
+				self.evolve(fun_evaluation, n, gen, progress)
+				self.generation = n
+				record = self._record(fun_evaluation, n, generation_started, started) if records else None
+				if checkpoint and n<gen and checkpoint.due(n):
+					checkpoint.save(self.get_state(n, gen))
+				yield record
+		finally:
+			if self.monitor: self.monitor.end()
+
+	def _evaluate(self, fun_evaluation):
+		'''evaluate the population, timed as the 'evaluate' phase of monitor'''
+		if self.monitor: self.monitor.start('evaluate')
+		self.population.evaluate(fun_evaluation, self.fun_fitness)
+		if self.monitor: self.monitor.stop('evaluate')
+
+	def _record(self, fun_evaluation, n, generation_started, started):
+		'''record of generation n, the population is evaluated'''
+		self._evaluate(fun_evaluation)
+		statistics = self.population.statistics
+		solution = self.population.get_solution(statistics.best_index).view()
+		solution.flags.writeable = False
+		now = time.perf_counter()
+		return {
+			'generation' : n,
+			'best'       : float(statistics.best),
+			'solution'   : solution,
+			'mean'       : float(statistics.mean),
+			'std'        : float(statistics.evaluation.std()),
+			'evaluations': self.population.evaluator.calls,
+			'time'       : now - generation_started,
+			'elapsed'    : now - started
+		}
+
+	def get_state(self, n, gen):
+		'''
+		state of the process at the end of generation n as a dict of arrays:
+		population, best so far, generation counter, operators and random generator
+		'''
+		state = {'population.'+key: value for key, value in self.population.get_state().items()}
+		evaluation = state['population.evaluation']
+		if not np.isnan(evaluation).all():
+			pos = np.nanargmin(evaluation)
+			state['best.solution'] = state['population.solutions'][pos]
+			state['best.evaluation'] = evaluation[pos]
+		for name in ('selection', 'crossover', 'mutation'):
+			state.update({name+'.'+key: value for key, value in getattr(self, name).get_state().items()})
+		state.update(get_random_state(self.rng))
+		state['generation'] = np.array(n)
+		state['gen'] = np.array(gen)
+		return state
+
+	def set_state(self, state):
+		'''restore the process from `get_state()`'''
+		extract = lambda prefix: {key[len(prefix):]: value for key, value in state.items() if key.startswith(prefix)}
+		self.population.set_state(extract('population.'))
+		for name in ('selection', 'crossover', 'mutation'):
+			getattr(self, name).set_state(extract(name+'.'))
+
+		# restore random state at last, since creating individuals may consume random numbers
+		set_random_state(state, self.rng)
+
+	def evolve(self, fun_evaluation, n, gen, progress=None):
+		'''
+		evolve the population by one generation:
+			- n       : current generation, starting from 1
+			- gen     : count of generations
+			- progress: fraction of the budget used, which adjusts the mutation rate. n/gen by default
+		'''
+		monitor = self.monitor
+
+		# evaluate and get the best individual in previous generation
+		if monitor: monitor.start('evaluate')
+		self.population.evaluate(fun_evaluation, self.fun_fitness)
+		the_best = self.population.elite()
+		if monitor: 
+			monitor.stop('evaluate')
+			monitor.evaluated(self.population)
+
+		# selection
+		if monitor: monitor.start('select')
+		self.population.select(self.selection)
+		if monitor: monitor.stop('select')
+
+		# crossover
+		if monitor: monitor.start('cross')
+		self.population.cross(self.crossover)
+		if monitor: monitor.stop('cross')
+
+		# mutation
+		if monitor: monitor.start('mutate')
+		if progress is None: progress = n/gen
+		rate = 1.0 - self.rng.random()**((1.0-progress)**3)
+		self.population.mutate(self.mutation, rate)
+
+		# elitism mechanism: 
+		# set a random individual as the best in previous generation
+		pos = self.rng.integers(self.population.size)
+		self.population.replace(pos, the_best)
+		if monitor: monitor.stop('mutate')
+
+		if monitor: monitor.record(self, n)
@@ -0,0 +1,73 @@
+#----------------------------------------------------------
+# Termination criteria of GA process
+#----------------------------------------------------------
+import time
+
+
+class Termination:
+	'''
+	stop GA process before the count of generations is reached, e.g.
+		g.run(f, 1000, termination=Termination(target=0.0, stagnation=50, seconds=60))
+	schedules depending on the progress, e.g. mutation rate, follow the budget used most:
+	generations, seconds or evaluations.
+	'''
+	def __init__(self, target=None, stagnation=None, tolerance=0.0, seconds=None, evaluations=None):
+		'''
+		- target     : stop when the best evaluation is not greater than target
+		- stagnation : stop when the best evaluation is not improved in `stagnation` generations
+		- tolerance  : improvement of the best evaluation less than tolerance is ignored
+		- seconds    : wall-clock budget
+		- evaluations: max count of objective function calls
+		'''
+		self.target = target
+		self.stagnation = stagnation
+		self.tolerance = tolerance
+		self.seconds = seconds
+		self.evaluations = evaluations
+		self.reason = None # why the process stopped
+
+	def start(self, evaluator):
+		'''called when the GA process starts'''
+		self._evaluator = evaluator
+		self._calls = evaluator.calls
+		self._start = time.perf_counter()
+		self._best = None
+		self._improved = 0 # generation of the last improvement
+		self.reason = None
+
+	@property
+	def elapsed(self):
+		return time.perf_counter() - self._start
+
+	@property
+	def calls(self):
+		'''count of objective function calls since started'''
+		return self._evaluator.calls - self._calls
+
+	def progress(self, n, gen):
+		'''fraction of the budget used most at generation n'''
+		progress = n/gen
+		if self.seconds:
+			progress = max(progress, self.elapsed/self.seconds)
+		if self.evaluations:
+			progress = max(progress, self.calls/self.evaluations)
+		return min(progress, 1.0)
+
+	def done(self, n, best):
+		'''
+		whether to stop before generation n, given the best evaluation of current population
+		'''
+		if self._best is None or best<self._best-self.tolerance:
+			self._best, self._improved = best, n
+		elif best<self._best:
+			self._best = best
+
+		if self.target is not None and best<=self.target:
+			self.reason = 'target'
+		elif self.stagnation and n-self._improved>=self.stagnation:
+			self.reason = 'stagnation'
+		elif self.seconds and self.elapsed>=self.seconds:
+			self.reason = 'seconds'
+		elif self.evaluations and self.calls>=self.evaluations:
+			self.reason = 'evaluations'
+		return self.reason is not None
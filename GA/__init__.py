@@ -1,2 +1,3 @@
 from . import GAPopulation
 from . import GAOperators
+from . import GAEvaluation
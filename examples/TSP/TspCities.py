@@ -1,29 +1,204 @@
+import math
 import numpy as np
+import TspLib
 
 class TSPCities:
-	"""TSP data set"""
-	def __init__(self, filename, sol_filename=None):
-		arr = np.loadtxt(filename)
-		self.cities = arr[:,1:]
-		self.dimension = arr.shape[0]
-		self.solution = np.loadtxt(sol_filename).astype(np.int32)-1 if sol_filename else None
-		self.distances = self.init_distances()
-
-	def init_distances(self):
-		X = self.cities[:,0].reshape((1,self.dimension))
-		Y = self.cities[:,1].reshape((1,self.dimension))
-		d = ((X-X.T)**2 + (Y-Y.T)**2)**0.5
+	"""
+	TSP data set. Distances are calculated on demand from float32 coordinates,
+	and a dense matrix is kept only for small instances, so that 100k cities fit in memory.
+	"""
+
+	MATRIX_SIZE = 2000 # keep dense distance matrix up to this count of cities
+
+	def __init__(self, filename, sol_filename=None, matrix=None, dtype=None, cache=True):
+		'''
+		- filename    : TSPLIB problem file, or plain file of (index, x, y) rows
+		- sol_filename: optimal tour file
+		- matrix      : keep dense distance matrix or not, None to decide by MATRIX_SIZE
+		- dtype       : dtype of distance matrix, np.float64 by default for plain file, otherwise np.int32.
+		                integer dtype rounds distances of plain file to the nearest integer like TSPLIB
+		- cache       : cache parsed data and distance matrix in .npy files beside the problem file
+		'''
+		data = TspLib.read_tsplib(filename, cache)
+		self.name = data['name']
+		self.dimension = data['dimension']
+		self.metric = data['edge_weight_type']
+		if dtype is None:
+			dtype = np.float64 if self.metric=='EUC' else np.int32
+		if self.metric=='EUC' and np.issubdtype(dtype, np.integer):
+			self.metric = 'EUC_2D'
+
+		# GEO coordinates are truncated to degrees, so keep the precision
+		coords = data['coords']
+		if not coords is None:
+			coords = np.asarray(coords, dtype=np.float64 if self.metric=='GEO' else np.float32)
+		self.cities = coords
+		self.solution = TspLib.read_tour(sol_filename) if sol_filename else None
+
+		self.distances = None
+		if self.metric=='EXPLICIT':
+			self.distances = np.asarray(data['weights'], dtype=dtype)
+		else:
+			if matrix is None: matrix = self.dimension<=self.MATRIX_SIZE
+			if matrix: self.distances = TspLib.cached_array(filename, 'distances-'+np.dtype(dtype).name,
+														lambda: self.init_distances(dtype), cache)
+		self.shared_data = None
+		self._points = None # coordinates as python lists for scalar distance
+
+	def init_distances(self, dtype=np.float64):
 		pos = np.arange(self.dimension)
-		d[pos,pos] = np.inf
+		d = self.edge_lengths(pos.reshape((-1,1)), pos.reshape((1,-1))).astype(dtype)
+		d[pos,pos] = 0
 		return d
 
+	def edge_lengths(self, i, j):
+		'''distances between cities i and j, element-wise for index arrays'''
+		if not self.distances is None:
+			return self.distances[i, j]
+		X, Y = self.cities[:,0], self.cities[:,1]
+		return TspLib.edge_lengths(self.metric, X[i], Y[i], X[j], Y[j])
+
+	def pair_distance(self, i, j):
+		'''distance between city i and j'''
+		if not self.distances is None:
+			return self.distances[i, j]
+		if not self.metric in ('EUC', 'EUC_2D'):
+			return float(self.edge_lengths(i, j))
+		if self._points is None:
+			self._points = self.cities.tolist()
+		(x1, y1), (x2, y2) = self._points[i], self._points[j]
+		d = math.sqrt((x1-x2)**2 + (y1-y2)**2)
+		return math.floor(d+0.5) if self.metric=='EUC_2D' else d
+
+	def neighbors(self, k=8):
+		'''
+		k nearest cities of each city, sorted by distance. cities are indexed by a uniform grid
+		with about k cities per cell, and the searched block of cells around each cell is
+		enlarged until it surely contains the k nearest cities.
+		'''
+		n = self.dimension
+		k = min(k, n-1)
+		res = np.zeros((n, k), dtype=np.int32)
+		if k<1: return res
+
+		# the grid works for distances increasing with euclidean distance
+		if not self.metric in ('EUC', 'EUC_2D', 'CEIL_2D', 'ATT'):
+			return self._neighbors_by_rows(k)
+
+		# grid cells
+		lower = self.cities.min(axis=0).astype(np.float64)
+		extent = max(float((self.cities.max(axis=0)-lower).max()), 1e-9)
+		num = max(int(math.sqrt(n/max(k,2))), 1) # cells per axis
+		size = extent / num
+		cell = np.minimum(((self.cities-lower)/size).astype(np.int64), num-1)
+		cell_id = cell[:,1]*num + cell[:,0]
+
+		# cities sorted by cell, cities in cell i are order[start[i]:start[i+1]]
+		order = np.argsort(cell_id, kind='stable')
+		start = np.zeros(num*num+1, dtype=np.int64)
+		np.cumsum(np.bincount(cell_id, minlength=num*num), out=start[1:])
+		points = self.cities[order].astype(np.float64)
+
+		for cx in range(num):
+			for cy in range(num):
+				i = cy*num + cx
+				if start[i]==start[i+1]: continue
+				query = points[start[i]:start[i+1]]
+				r = 1
+				while True:
+					# cells in a row of the block are contiguous in the sorted cities
+					x1, x2 = max(cx-r, 0), min(cx+r, num-1)
+					rows = range(max(cy-r, 0), min(cy+r, num-1)+1)
+					index = np.concatenate([np.arange(start[y*num+x1], start[y*num+x2+1]) for y in rows])
+					if index.shape[0]>k or r>=num:
+						d = ((query[:,None,:]-points[index][None,:,:])**2).sum(axis=2)
+						d[np.arange(query.shape[0]), np.searchsorted(index, np.arange(start[i], start[i+1]))] = np.inf # itself
+						near = np.argpartition(d, k-1, axis=1)[:, :k]
+						near_d = np.take_along_axis(d, near, axis=1)
+
+						# cities out of the block are farther than r cells
+						if r>=num or near_d.max()<=(r*size)**2:
+							sort = np.argsort(near_d, axis=1, kind='stable')
+							res[order[start[i]:start[i+1]]] = order[index[np.take_along_axis(near, sort, axis=1)]]
+							break
+					r += 1
+
+		return res
+
+	def _neighbors_by_rows(self, k, rows=256):
+		'''k nearest cities from distances between each city and all cities, calculated by blocks of rows'''
+		res = np.zeros((self.dimension, k), dtype=np.int32)
+		pos = np.arange(self.dimension)
+		for i in range(0, self.dimension, rows):
+			index = pos[i:i+rows]
+			d = np.array(self.edge_lengths(index.reshape((-1,1)), pos.reshape((1,-1))), dtype=np.float64)
+			d[np.arange(index.shape[0]), index] = np.inf # itself
+			near = np.argpartition(d, k-1, axis=1)[:, :k]
+			sort = np.argsort(np.take_along_axis(d, near, axis=1), axis=1, kind='stable')
+			res[index] = np.take_along_axis(near, sort, axis=1)
+		return res
+
 	def distance(self, tour):
-		temp_tour = np.empty_like(tour)
-		temp_tour[0:-1] = tour[1:]
-		temp_tour[-1] = tour[0]
-		res = self.distances[tour, temp_tour]
-		return res.sum()
+		'''
+		length of a tour, or lengths of tours stored as columns of a (dimension, n) matrix
+		'''
+		next_tour = np.roll(tour, -1, axis=0)
+		res = self.edge_lengths(tour, next_tour)
+		return res.sum(axis=0)
+
+	distance.batch = True # batch evaluation is supported
+
+	def distance_delta(self, tours, move, params):
+		'''
+		change of tour lengths after applying a move to each tour, O(1) for each tour:
+			- tours : (n, dimension) matrix, tours before the move
+			- move  : 'reverse' for reversing cities in range [start, end], i.e. 2-opt move
+			- params: (n, 2) matrix of (start, end)
+		'''
+		if move != 'reverse':
+			raise ValueError('unsupported move: {0}'.format(move))
+
+		rows = np.arange(tours.shape[0])
+		start, end = params[:,0], params[:,1]
+
+		# edges (a,b), (c,d) are replaced by (a,c), (b,d)
+		a, b = tours[rows, start-1], tours[rows, start]
+		c, d = tours[rows, end], tours[rows, (end+1)%self.dimension]
+		
+		# reversing at least dimension-1 cities gets the same loop
+		same = end-start+1 >= self.dimension-1
+		L = self.edge_lengths
+		delta = L(a,c) + L(b,d) - L(a,b) - L(c,d)
+		return np.where(same, 0.0, delta)
+
+
+	def share(self, directory=None):
+		'''
+		publish cities and distances once, so that worker processes attach them zero-copy
+		rather than pickling a copy. shared memory by default, or memory-mapped .npy files under `directory`
+		'''
+		from GA.GAEvaluation.SharedData import SharedData
+		arrays = {key: getattr(self, key) for key in ('cities', 'distances') if not getattr(self, key) is None}
+		self.shared_data = SharedData(directory, **arrays)
+		self._attach()
+		return self.shared_data
+
+	def _attach(self):
+		for key in self.shared_data.keys():
+			setattr(self, key, self.shared_data[key])
+
+	def __getstate__(self):
+		state = self.__dict__.copy()
+		state['_points'] = None # rebuilt on demand
+		if self.shared_data: # pickle names of shared arrays only
+			for key in self.shared_data.keys():
+				del state[key]
+		return state
 
+	def __setstate__(self, state):
+		self.__dict__.update(state)
+		if self.shared_data:
+			self._attach()
 
 	@property
 	def min_distance(self):
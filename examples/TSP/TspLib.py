@@ -0,0 +1,217 @@
+#----------------------------------------------------------
+# TSPLIB reader with binary cache
+#----------------------------------------------------------
+import os
+import numpy as np
+
+
+# supported EDGE_WEIGHT_TYPE, and 'EUC' for plain euclidean distance without rounding
+METRICS = ('EUC', 'EUC_2D', 'CEIL_2D', 'ATT', 'GEO', 'EXPLICIT')
+
+# indices filling the symmetric matrix from an EDGE_WEIGHT_SECTION, column formats
+# of upper (lower) triangle are the row formats of lower (upper) triangle
+WEIGHT_FORMATS = {
+	'FULL_MATRIX'   : lambda n: np.indices((n,n)).reshape((2,-1)),
+	'UPPER_ROW'     : lambda n: np.triu_indices(n, 1),
+	'LOWER_ROW'     : lambda n: np.tril_indices(n, -1),
+	'UPPER_DIAG_ROW': lambda n: np.triu_indices(n),
+	'LOWER_DIAG_ROW': lambda n: np.tril_indices(n),
+	'UPPER_COL'     : lambda n: np.tril_indices(n, -1),
+	'LOWER_COL'     : lambda n: np.triu_indices(n, 1),
+	'UPPER_DIAG_COL': lambda n: np.tril_indices(n),
+	'LOWER_DIAG_COL': lambda n: np.triu_indices(n),
+}
+
+
+def edge_lengths(metric, x1, y1, x2, y2):
+	'''
+	TSPLIB distances between points (x1, y1) and (x2, y2), element-wise for arrays
+		- metric: one of METRICS except 'EXPLICIT'
+	'''
+	if metric=='GEO':
+		lat1, lon1, lat2, lon2 = _geo(x1), _geo(y1), _geo(x2), _geo(y2)
+		q1, q2, q3 = np.cos(lon1-lon2), np.cos(lat1-lat2), np.cos(lat1+lat2)
+		c = np.clip(0.5*((1.0+q1)*q2 - (1.0-q1)*q3), -1.0, 1.0)
+		return np.floor(6378.388*np.arccos(c) + 1.0)
+
+	dx = np.asarray(x1, dtype=np.float64) - x2
+	dy = np.asarray(y1, dtype=np.float64) - y2
+	if metric=='ATT': # pseudo-euclidean
+		r = np.sqrt((dx*dx + dy*dy)/10.0)
+		t = np.floor(r+0.5)
+		return np.where(t<r, t+1.0, t)
+
+	d = np.sqrt(dx*dx + dy*dy)
+	if metric=='EUC':
+		return d
+	elif metric=='EUC_2D':
+		return np.floor(d+0.5)
+	elif metric=='CEIL_2D':
+		return np.ceil(d)
+	else:
+		raise ValueError('unsupported metric: {0}'.format(metric))
+
+
+def _geo(v):
+	'''latitude or longitude in DDD.MM format to radians, with PI defined by TSPLIB'''
+	deg = np.trunc(v)
+	return 3.141592*(deg + 5.0*(v-deg)/3.0)/180.0
+
+
+def read_tsplib(filename, cache=True):
+	'''
+	read a TSPLIB problem, or a plain file of (index, x, y) rows. return a dict:
+		- name, dimension
+		- edge_weight_type: one of METRICS, 'EUC' for the plain file
+		- coords : (dimension, 2) matrix, or None for explicit weights without display data
+		- weights: (dimension, dimension) matrix for explicit weights, otherwise None
+	arrays are cached in .npy files beside the problem file at first reading,
+	and memory-mapped in later readings.
+	'''
+	if cache:
+		data = _load_cache(filename)
+		if data: return data
+
+	with open(filename) as f:
+		data = _parse(f)
+
+	if cache:
+		_save_cache(filename, data)
+		data = _load_cache(filename) or data
+	return data
+
+
+def read_tour(filename):
+	'''read a TSPLIB tour, or a plain file of city indexes. return zero-based indexes'''
+	with open(filename) as f:
+		tokens = []
+		for line in f:
+			tokens.extend(line.split())
+			if tokens and not _is_number(tokens[0]): tokens = [] # header line
+			if '-1' in tokens: break
+	tour = np.array(tokens, dtype=np.int64)
+	if (tour==-1).any(): tour = tour[:np.argmax(tour==-1)]
+	return tour.astype(np.int32)-1
+
+
+def cached_array(filename, key, build, cache=True):
+	'''
+	array derived from the problem file, e.g. distance matrix:
+	memory-mapped from `filename.key.npy` if it is up to date, otherwise built and saved there
+	'''
+	if not cache: return build()
+	path = '{0}.{1}.npy'.format(filename, key)
+	if _is_valid(filename, path):
+		return np.load(path, mmap_mode='r')
+	array = build()
+	_save_array(path, array)
+	return array
+
+
+def _is_number(token):
+	try:
+		float(token)
+	except ValueError:
+		return False
+	return True
+
+
+def _read_numbers(f, count):
+	'''read `count` numbers from the following lines'''
+	tokens = []
+	while len(tokens)<count:
+		line = f.readline()
+		if not line: raise ValueError('unexpected end of file')
+		tokens.extend(line.split())
+	return np.array(tokens[:count], dtype=np.float64)
+
+
+def _read_coords(f, dimension):
+	'''read `dimension` lines of (index, x, y), ordered by index'''
+	arr = _read_numbers(f, 3*dimension).reshape((dimension, 3))
+	coords = np.empty((dimension, 2))
+	coords[arr[:,0].astype(np.int64)-1] = arr[:,1:]
+	return coords
+
+
+def _parse(f):
+	data = {'name': '', 'dimension': 0, 'edge_weight_type': 'EUC', 'coords': None, 'weights': None}
+	header = {}
+
+	# plain file of (index, x, y) rows
+	first = f.readline()
+	if first.split() and _is_number(first.split()[0]):
+		arr = np.array((first + f.read()).split(), dtype=np.float64).reshape((-1, 3))
+		data['dimension'] = arr.shape[0]
+		data['coords'] = arr[:,1:]
+		return data
+
+	line = first
+	while line:
+		key, _, value = line.partition(':')
+		key, value = key.strip().upper(), value.strip()
+		if key=='EOF':
+			break
+		elif key in ('NODE_COORD_SECTION', 'DISPLAY_DATA_SECTION'):
+			coords = _read_coords(f, int(header['DIMENSION']))
+			if key=='NODE_COORD_SECTION' or data['coords'] is None: data['coords'] = coords
+		elif key=='EDGE_WEIGHT_SECTION':
+			n = int(header['DIMENSION'])
+			weight_format = header.get('EDGE_WEIGHT_FORMAT', 'FULL_MATRIX')
+			rows, cols = WEIGHT_FORMATS[weight_format](n)
+			weights = np.zeros((n, n))
+			weights[rows, cols] = _read_numbers(f, rows.shape[0])
+			# mirror triangular formats only, a full matrix may be asymmetric, e.g. ATSP
+			if weight_format!='FULL_MATRIX':
+				weights[cols, rows] = weights[rows, cols]
+			data['weights'] = weights
+		elif key.endswith('_SECTION'):
+			raise ValueError('unsupported section: {0}'.format(key))
+		elif key:
+			header[key] = value
+		line = f.readline()
+
+	data['name'] = header.get('NAME', '')
+	data['dimension'] = int(header['DIMENSION'])
+	data['edge_weight_type'] = header.get('EDGE_WEIGHT_TYPE', 'EUC_2D')
+	if not data['edge_weight_type'] in METRICS:
+		raise ValueError('unsupported EDGE_WEIGHT_TYPE: {0}'.format(data['edge_weight_type']))
+	return data
+
+
+def _is_valid(filename, path):
+	'''cache file exists and is newer than the source file'''
+	return os.path.exists(path) and os.path.getmtime(path)>=os.path.getmtime(filename)
+
+
+def _save_array(path, array):
+	'''write to a temporary file and rename, so a reader never sees a partial file'''
+	tmp = '{0}.{1}.tmp'.format(path, os.getpid())
+	with open(tmp, 'wb') as f:
+		np.save(f, array)
+	os.replace(tmp, path)
+
+
+def _load_cache(filename):
+	meta = filename + '.meta.npz'
+	if not _is_valid(filename, meta): return None
+	with np.load(meta) as arrays:
+		data = {key: arrays[key].item() for key in ('name', 'dimension', 'edge_weight_type')}
+	for key in ('coords', 'weights'):
+		path = '{0}.{1}.npy'.format(filename, key)
+		data[key] = np.load(path, mmap_mode='r') if os.path.exists(path) else None
+	return data
+
+
+def _save_cache(filename, data):
+	for key in ('coords', 'weights'):
+		path = '{0}.{1}.npy'.format(filename, key)
+		if not data[key] is None:
+			_save_array(path, data[key])
+		elif os.path.exists(path): # stale array of a previous version
+			os.remove(path)
+
+	# meta data is written at last, so it marks a complete cache
+	tmp = '{0}.meta.{1}.tmp.npz'.format(filename, os.getpid())
+	np.savez(tmp, **{key: data[key] for key in ('name', 'dimension', 'edge_weight_type')})
+	os.replace(tmp, filename + '.meta.npz')
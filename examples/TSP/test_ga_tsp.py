@@ -1,7 +1,6 @@
 import os
 import sys
 import time
-import numpy as np
 
 script_path = os.path.abspath(__file__) # current script path
 package_path = os.path.dirname(os.path.dirname(os.path.dirname(script_path)))
@@ -10,68 +9,45 @@ sys.path.append(package_path)
 # built-in modules from GA Package
 from GA.GAPopulation.SequenceIndividual import UniqueLoopIndividual
 from GA.GAPopulation.Population import Population
-from GA.GAOperators.Selection import RouletteWheelSelection, LinearRankingSelection
-from GA.GAOperators.Crossover import SequencePMXCrossover, SequenceOXCrossover
+from GA.GAOperators.Selection import RouletteWheelSelection
+from GA.GAOperators.Crossover import SequenceOXCrossover
 from GA.GAOperators.Mutation import UniqueSeqMutation
 from GA.GAProcess import GA
+from GA.GAIsland import IslandGA
+from GA.GAOperators.LocalSearch import NeighborListLocalSearch
+from GA.GAEvaluation.Evaluator import Evaluator, ProcessPoolEvaluator
 
 from TspCities import TSPCities
 
 
-class TSPPopulation(Population):
-	'''user defined Poopulation for TSP'''
-	def __init__(self, cities, individual, size=50):
-		super().__init__(individual, size)
-		self.cities = cities
-
-	def evaluate(self, fun_evaluation, fun_fitness):
-		'''
-		calculate objectibe value and fitness for each individual.
-			- fun_evaluation: objective function
-			- fun_fitness  	: population fitness based on evaluation
-		'''
-		# optimize locally with 2-opt method
-		chances = np.random.rand(self.individual.dimension) < 0.3
-		solutions = [self._two_opt(I.solution, fun_evaluation) if c else I.solution for I,c in zip(self.individuals, chances)]
-		# calculate fitness
-		evaluation = np.array([fun_evaluation(solution) for solution in solutions])
-		fitness = fun_fitness(evaluation)
-		fitness = fitness/fitness.sum() # normalize
-		
-		# set attributes for each individual
-		for I, s, e, f in zip(self.individuals, solutions, evaluation, fitness):
-			I.solution = s
-			I.evaluation = e
-			I.fitness = f
-
-	def _two_opt(self, solution, fun_evaluation):
-		N = self.individual.dimension
-		pos = np.random.randint(N)
-		stable = False
-		count = 0
-		while not stable and count < 20:
-			stable = True
-			for i in range(pos, N):
-				for j in range(i+1,N):
-					new_solution = solution.copy()
-					new_solution[i:j+1] = solution[i:j+1][::-1] # reverse genes at specified positions
-					if fun_evaluation(new_solution)<fun_evaluation(solution):
-						solution = new_solution
-						stable = False
-						count += 1
-						break
-				if not stable: break
-
-		return solution
-
 def test(cities, gen):
 
-	# GA process
+	# GA process: memetic GA with 2-opt/Or-opt local search on 30% individuals
+	I = UniqueLoopIndividual(cities.dimension)
+	LS = NeighborListLocalSearch(cities.neighbors(8), cities.pair_distance)
+	P = Population(I, 16, evaluator=Evaluator(local_search=LS, rate=0.3))
+	R = RouletteWheelSelection()
+	O = SequenceOXCrossover([0.75, 0.95])
+	M = UniqueSeqMutation(0.15)
+	g = GA(P, R, O, M)
+
+	# solve
+	res = g.run(cities.distance, gen)
+
+	return res
+
+
+def test_parallel(cities, gen):
+
+	# GA process: evaluation and local search in worker processes,
+	# which attach the shared distances rather than copying them;
+	# mutated tours are evaluated incrementally
 	I = UniqueLoopIndividual(cities.dimension)
-	P = TSPPopulation(cities, I, 16)
-	L = LinearRankingSelection()
+	data = cities.share()
+	LS = NeighborListLocalSearch(cities.neighbors(8), cities.pair_distance)
+	E = ProcessPoolEvaluator(chunksize=2, local_search=LS, rate=0.3, shared_data=data, delta=cities.distance_delta)
+	P = Population(I, 16, evaluator=E)
 	R = RouletteWheelSelection()
-	C = SequencePMXCrossover([0.75, 0.95])
 	O = SequenceOXCrossover([0.75, 0.95])
 	M = UniqueSeqMutation(0.15)
 	g = GA(P, R, O, M)
@@ -82,6 +58,26 @@ def test(cities, gen):
 	return res
 
 
+def test_islands(cities, gen, num=4):
+
+	# island model: GA processes exchange the best 2 tours along a ring every 10 generations
+	LS = NeighborListLocalSearch(cities.neighbors(8), cities.pair_distance)
+	islands = []
+	for i in range(num):
+		I = UniqueLoopIndividual(cities.dimension)
+		P = Population(I, 16, evaluator=Evaluator(local_search=LS, rate=0.3))
+		R = RouletteWheelSelection()
+		O = SequenceOXCrossover([0.75, 0.95])
+		M = UniqueSeqMutation(0.15)
+		islands.append(GA(P, R, O, M))
+	g = IslandGA(islands, topology='ring', interval=10, migrants=2)
+
+	# solve
+	res = g.run(cities.distance, gen)
+
+	return res
+
+
 if __name__ == '__main__':
 
 	# import matplotlib.pyplot as plt
@@ -92,6 +88,8 @@ if __name__ == '__main__':
 	# build-in GA process
 	s1 = time.time()
 	res = test(cities, 250)
+	# res = test_parallel(cities, 250)
+	# res = test_islands(cities, 250)
 
 	# output
 	s2 = time.time()
@@ -0,0 +1,187 @@
+'''
+Benchmark suite over the test functions and TSP datasets:
+	python benchmark.py [--quick] [--repeats 3] [--output results.json] [--filter Rosenbrock]
+
+Each case is solved with fixed seeds, and the results are saved as JSON sorted by case,
+so that two versions are compared by diffing the output files. Metrics of each run:
+	- time_per_generation, evaluations_per_second
+	- peak_memory: bytes traced by tracemalloc in a separate run, not affecting timings
+	- error      : best evaluation minus the known optimum, gap relative to the optimum for TSP
+	- time_to_target: seconds until the error is within the target, None if not reached
+'''
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import tracemalloc
+import numpy as np
+
+script_path = os.path.abspath(__file__) # current script path
+examples_path = os.path.dirname(os.path.dirname(script_path))
+package_path = os.path.dirname(examples_path)
+sys.path.append(package_path)
+sys.path.append(os.path.join(examples_path, 'test_functions'))
+sys.path.append(os.path.join(examples_path, 'TSP'))
+
+from GA.GAPopulation.DecimalIndividual import DecimalFloatIndividual
+from GA.GAPopulation.SequenceIndividual import UniqueLoopIndividual
+from GA.GAPopulation.Population import Population
+from GA.GAPopulation.ArrayPopulation import ArrayPopulation
+from GA.GAOperators import Selection, Crossover
+from GA.GAOperators.Mutation import DecimalMutation, UniqueSeqMutation
+from GA.GAOperators.LocalSearch import NeighborListLocalSearch
+from GA.GAEvaluation.Evaluator import Evaluator, batch_evaluation
+from GA.GAMonitor import Monitor
+from GA.GAProcess import GA
+
+import functions
+from TspCities import TSPCities
+
+DATASET_PATH = os.path.join(examples_path, 'TSP', 'dataset')
+POPULATIONS = {'Population': Population, 'ArrayPopulation': ArrayPopulation}
+
+
+def function_cases(generations, sizes=(50, 200)):
+	'''every test function with population types, sizes and selection operators'''
+	for FUN in functions.FUN.__subclasses__():
+		for population in POPULATIONS:
+			for size in sizes:
+				for selection in ('RouletteWheelSelection', 'TournamentSelection'):
+					yield {'problem': FUN.__name__, 'population': population, 'size': size,
+						'selection': selection, 'crossover': 'DecimalCrossover', 'local_search': False,
+						'generations': generations, 'target': 1e-4}
+
+
+def tsp_cases(generations):
+	'''eil51 and a280 with population types, crossover operators, with or without local search'''
+	for name in ('eil51', 'a280'):
+		for population in POPULATIONS:
+			for crossover in ('SequencePMXCrossover', 'SequenceOXCrossover'):
+				for local_search in (False, True):
+					yield {'problem': name, 'population': population, 'size': 16 if local_search else 100,
+						'selection': 'RouletteWheelSelection', 'crossover': crossover, 'local_search': local_search,
+						'generations': generations, 'target': 0.01}
+
+
+def build(case):
+	'''GA process, objective function and optimum of a case'''
+	if case['problem'] in ('eil51', 'a280'):
+		# the optimal tours are optimal under TSPLIB EUC_2D, i.e. rounded integer distances
+		cities = TSPCities(os.path.join(DATASET_PATH, case['problem']+'.tsp'), os.path.join(DATASET_PATH, case['problem']+'.opt.tour'),
+					dtype=np.int32)
+		I = UniqueLoopIndividual(cities.dimension)
+		LS = NeighborListLocalSearch(cities.neighbors(8), cities.pair_distance) if case['local_search'] else None
+		E = Evaluator(local_search=LS, rate=0.3)
+		C = getattr(Crossover, case['crossover'])([0.75, 0.95])
+		M = UniqueSeqMutation(0.15)
+		fun, optimum = cities.distance, float(cities.min_distance)
+	else:
+		f = getattr(functions, case['problem'])()
+		I = DecimalFloatIndividual(f.ranges)
+		E = Evaluator()
+		C = Crossover.DecimalCrossover([0.6, 0.9], 0.55)
+		M = DecimalMutation(0.2)
+		fun, optimum = batch_evaluation(f.objective), float(f.value)
+
+	P = POPULATIONS[case['population']](I, case['size'], evaluator=E)
+	S = getattr(Selection, case['selection'])()
+	return GA(P, S, C, M), fun, optimum
+
+
+def error(case, best, optimum):
+	'''distance to the optimum: absolute for functions, relative for TSP'''
+	return (best-optimum)/optimum if case['problem'] in ('eil51', 'a280') else best-optimum
+
+
+def run_case(case, seed):
+	'''solve a case with the seed, and measure it'''
+	np.random.seed(seed)
+	g, fun, optimum = build(case)
+
+	# time to target from the best evaluation of each generation
+	reached = []
+	def observer(record):
+		if not reached and error(case, record['best'], optimum)<=case['target']:
+			reached.append(time.perf_counter()-start)
+	g.monitor = Monitor(observer)
+
+	start = time.perf_counter()
+	res = g.run(fun, case['generations'])
+	elapsed = time.perf_counter() - start
+
+	err = error(case, res.evaluation, optimum)
+	if not reached and err<=case['target']: reached.append(elapsed)
+	return {
+		'seed': seed,
+		'best': float(res.evaluation),
+		'error': float(err),
+		'time_to_target': reached[0] if reached else None,
+		'time_per_generation': elapsed/case['generations'],
+		'evaluations_per_second': g.population.evaluator.calls/elapsed
+	}
+
+
+def peak_memory(case, seed):
+	'''peak traced memory of solving a case'''
+	np.random.seed(seed)
+	g, fun, optimum = build(case)
+	tracemalloc.start()
+	try:
+		g.run(fun, case['generations'])
+		return tracemalloc.get_traced_memory()[1]
+	finally:
+		tracemalloc.stop()
+
+
+def case_name(case):
+	return '{problem}/{population}/{size}/{selection}/{crossover}{ls}'.format(ls='+LS' if case['local_search'] else '', **case)
+
+
+def version():
+	'''git commit of the package, None if unknown'''
+	try:
+		return subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=package_path, stderr=subprocess.DEVNULL).decode().strip()
+	except Exception:
+		return None
+
+
+def main():
+	parser = argparse.ArgumentParser(description='benchmark GA on test functions and TSP datasets')
+	parser.add_argument('--quick', action='store_true', help='fewer generations for a smoke test')
+	parser.add_argument('--repeats', type=int, default=3, help='count of seeds per case')
+	parser.add_argument('--output', default='results.json', help='JSON file to save results')
+	parser.add_argument('--filter', default='', help='run cases whose name contains the text only')
+	parser.add_argument('--no-memory', action='store_true', help='skip measuring peak memory')
+	args = parser.parse_args()
+
+	cases = list(function_cases(50 if args.quick else 300)) + list(tsp_cases(20 if args.quick else 250))
+	cases = [case for case in cases if args.filter in case_name(case)]
+
+	results = []
+	for i, case in enumerate(cases):
+		runs = [run_case(case, seed) for seed in range(args.repeats)]
+		summary = {key: float(np.median([run[key] for run in runs])) for key in
+					('best', 'error', 'time_per_generation', 'evaluations_per_second')}
+		reached = [run['time_to_target'] for run in runs if run['time_to_target'] is not None]
+		summary['time_to_target'] = float(np.median(reached)) if reached else None
+		summary['success_rate'] = len(reached)/len(runs)
+		summary['peak_memory'] = None if args.no_memory else peak_memory(case, 0)
+		results.append({'name': case_name(case), 'case': case, 'summary': summary, 'runs': runs})
+		print('[{0}/{1}] {2}: error={3:.6g}, {4:.3g} s/gen'.format(i+1, len(cases), case_name(case),
+					summary['error'], summary['time_per_generation']))
+
+	output = {
+		'version': version(),
+		'python': platform.python_version(),
+		'numpy': np.__version__,
+		'results': sorted(results, key=lambda res: res['name'])
+	}
+	with open(args.output, 'w') as f:
+		json.dump(output, f, indent=1, sort_keys=True)
+
+
+if __name__ == '__main__':
+	main()
@@ -1,6 +1,7 @@
 # test functions for single-objective optimization cases
 # 2-dimensional
 # minimize
+# objectives broadcast over a (2, n) matrix, so they support batch evaluation
 
 import numpy as np	
 
@@ -12,6 +12,7 @@ from GA.GAOperators.Selection import RouletteWheelSelection
 from GA.GAOperators.Crossover import DecimalCrossover
 from GA.GAOperators.Mutation import DecimalMutation
 from GA.GAProcess import GA
+from GA.GAEvaluation.Evaluator import batch_evaluation
 
 from functions import *
 
@@ -33,7 +34,7 @@ def test(FUN):
 	g = GA(P, R, C, M)
 
 	# solve
-	res = g.run(f.objective, 500)
+	res = g.run(batch_evaluation(f.objective), 500)
 
 	# theoretical result
 	print('---TEST FUNCTION: {0}---'.format(FUN.__name__))